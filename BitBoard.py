@@ -0,0 +1,84 @@
+from Board import AttackResult, Board
+from config import scaled_fleet
+from placement import placement_for
+
+
+class BitBoard(Board):
+    """Board that keeps ships, hits and misses as integer bitmasks.
+
+    Cell (row, col) maps to bit ``row * size + col``. The public API and the
+    "hit"/"miss"/"repeat" results are the same as :class:`Board`, so the two
+    are interchangeable anywhere a board is created. Every mask operation
+    costs time in proportion to the board's area, so it is meant for the
+    standard and other small boards; large boards should use :class:`Board`.
+    """
+
+    __slots__ = ("ship_mask", "hit_mask", "miss_mask")
+
+    def __init__(self, size=10, fleet=None):
+        self.size = size
+        self.fleet = fleet or scaled_fleet(size)
+        self.ship_mask = 0
+        self.hit_mask = 0
+        self.miss_mask = 0
+        self.ships = []
+        self.placed = {}
+        self.ship_at = {}
+        self.sunk = []
+        self.remaining = 0
+        self.placement = placement_for(size)
+        self.forbidden = self.placement.empty_zone()
+        self.validity = {}
+
+    @property
+    def grid(self):
+        return [[self.cell(r, c) for c in range(self.size)] for r in range(self.size)]
+
+    def cell(self, row, col):
+        bit = 1 << (row * self.size + col)
+        if self.hit_mask & bit:
+            return "X"
+        if self.miss_mask & bit:
+            return "O"
+        if self.ship_mask & bit:
+            return "S"
+        return "~"
+
+    def mark(self, row, col, result):
+        bit = 1 << (row * self.size + col)
+        if result.outcome == "hit":
+            self.hit_mask |= bit
+        else:
+            self.miss_mask |= bit
+        if result.sunk:
+            self.sunk.append(result.ship)
+
+    def place_ships(self, ship, positions):
+        
+        for row, col in positions:
+            index = row * self.size + col
+            self.ship_mask |= 1 << index
+            self.ship_at[index] = ship
+        self.forbidden |= self.placement.zone(positions)
+        self.validity.clear()
+        ship.is_placed = True
+        ship.position = positions
+        self.ships.append(ship)
+        self.placed[type(ship)] = self.placed.get(type(ship), 0) + 1
+        self.remaining += 1
+
+    def receive_attack(self, row, col):
+        
+        index = row * self.size + col
+        bit = 1 << index
+        if (self.hit_mask | self.miss_mask) & bit:
+            return AttackResult("repeat", None, False, self.remaining)
+        if self.ship_mask & bit:
+            self.hit_mask |= bit
+            return self._register_hit(self.ship_at[index])
+        self.miss_mask |= bit
+        return AttackResult("miss", None, False, self.remaining)
+
+    def all_ships_sunk(self):
+        
+        return self.remaining == 0
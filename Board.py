@@ -1,43 +1,112 @@
+from collections import namedtuple
+from config import column_label, scaled_fleet
+from placement import placement_for
+
+# outcome is "hit", "miss" or "repeat"; ship is the Ship that was struck (or None),
+# remaining is how many of the defender's ships are still afloat
+AttackResult = namedtuple("AttackResult", ["outcome", "ship", "sunk", "remaining"])
+_HIDE_SHIPS = str.maketrans("S", "~")
+
 class Board:
-    def __init__(self, size=10):
+    __slots__ = ("size", "fleet", "grid", "ships", "placed", "ship_at", "sunk", "remaining",
+                 "placement", "forbidden", "validity")
+
+    def __init__(self, size=10, fleet=None):
         self.size = size
-        self.grid = [["~" for _ in range(size)] for _ in range(size)]
+        self.fleet = fleet or scaled_fleet(size)
+        self.grid = [["~"] * size for _ in range(size)]
+        self.ships = []
+        self.placed = {}
+        self.ship_at = {}
+        self.sunk = []
+        self.remaining = 0
+        self.placement = placement_for(size)
+        self.forbidden = self.placement.empty_zone()
+        self.validity = {}
+
+    def cell(self, row, col):
+        return self.grid[row][col]
+
+    def mark(self, row, col, result):
+        # Records an attack outcome on the view a player keeps of enemy waters
+        self.grid[row][col] = "X" if result.outcome == "hit" else "O"
+        if result.sunk:
+            self.sunk.append(result.ship)
 
     def display(self, hide_ships=True):
-        
-        columns = "A B C D E F G H I J"
-        print("  " + columns)
+        # One write for the whole board
+        print("\n".join(self.lines(hide_ships)))
+
+    def lines(self, hide_ships=True):
+        # The board as text: a header of column labels, then one line per row
+        label_width = len(str(self.size - 1))
+        cell_width = len(column_label(self.size - 1))
+        pad = " " * (cell_width - 1)
+        columns = " ".join(column_label(j).rjust(cell_width) for j in range(self.size))
+        lines = [" " * (label_width + 1) + columns]
+        hidden = _HIDE_SHIPS if hide_ships else None
         for i, row in enumerate(self.grid):
-            row_display = []
-            for cell in row:
-                if hide_ships and cell == "S":
-                    row_display.append("~")
-                else:
-                    row_display.append(cell)
-            print(f"{i} " + " ".join(row_display))
+            text = pad + (" " + pad).join(row)
+            if hidden:
+                text = text.translate(hidden)
+            lines.append(f"{i:>{label_width}} " + text)
+        return lines
+
+    def ships_left(self, ship_class):
+        # Fleet limits are kept per board, so any number of games can be set up at once
+        for fleet_class, count in self.fleet:
+            if fleet_class is ship_class:
+                return count - self.placed.get(ship_class, 0)
+        return 0
+
+    def can_place(self, ship_size, orientation, row, col):
+        
+        footprint = self.placement.footprint(ship_size, orientation, row, col)
+        return footprint is not None and not footprint & self.forbidden
+
+    def validity_map(self, ship_size, orientation):
+        # Legality of every anchor for one ship shape, rebuilt lazily after a placement
+        key = (ship_size, orientation)
+        valid = self.validity.get(key)
+        if valid is None:
+            forbidden = self.forbidden
+            valid = self.validity[key] = [footprint is not None and not footprint & forbidden
+                                          for footprint in self.placement.footprints(ship_size, orientation)]
+        return valid
 
     def place_ships(self, ship, positions):
        
         for row, col in positions:
             self.grid[row][col] = "S"
+            self.ship_at[row * self.size + col] = ship
+        self.forbidden |= self.placement.zone(positions)
+        self.validity.clear()
         ship.is_placed = True
         ship.position = positions
+        self.ships.append(ship)
+        self.placed[type(ship)] = self.placed.get(type(ship), 0) + 1
+        self.remaining += 1
 
     def receive_attack(self, row, col):
        
         current = self.grid[row][col]
         if current in ["X", "O"]:
-            return "repeat"
+            return AttackResult("repeat", None, False, self.remaining)
         elif current == "S":
             self.grid[row][col] = "X"
-            return "hit"
+            return self._register_hit(self.ship_at[row * self.size + col])
         else:
             self.grid[row][col] = "O"
-            return "miss"
+            return AttackResult("miss", None, False, self.remaining)
+
+    def _register_hit(self, ship):
+        ship.hit()
+        sunk = ship.is_sunk()
+        if sunk:
+            self.sunk.append(ship)
+            self.remaining -= 1
+        return AttackResult("hit", ship, sunk, self.remaining)
 
     def all_ships_sunk(self):
-       
-        for row in self.grid:
-            if "S" in row:
-                return False
-        return True
+        # Every placed ship is counted in remaining until it sinks
+        return self.remaining == 0
@@ -1,20 +1,28 @@
 from Board import Board
-from Ship import Battleship, Cruiser, Submarine, Destroyer
-
-COLUMNS = ["A", "B", "C", "D", "E", "F", "G", "H", "I", "J"]
+from config import column_index, column_label, parse_cell, ships_to_place
+from fleet import random_fleet
 
 class Player:
-    def __init__(self, name, board: Board, opponent_board: Board):
+    __slots__ = ("name", "board", "opponent_board", "move_log")
+
+    def __init__(self, name, board: Board, opponent_board: Board, fleet=None):
         self.name = name
         self.board = board
         self.opponent_board = opponent_board
+        self.move_log = None
+        if fleet:
+            # Both sides play the same fleet, so the view of the enemy waters knows what is out there
+            board.fleet = fleet
+            opponent_board.fleet = fleet
 
-        self.ships_to_place = {
-            1: ('Battleship', Battleship, 1, 4),
-            2: ('Cruiser', Cruiser, 2, 3),
-            3: ('Submarine', Submarine, 3, 2),
-            4: ('Destroyer', Destroyer, 4, 1),
-        }
+    @property
+    def fleet(self):
+        # The board enforces the fleet, so it is the one place it is kept
+        return self.board.fleet
+
+    @property
+    def ships_to_place(self):
+        return ships_to_place(self.fleet, [self.board.ships_left(ship_class) for ship_class, _ in self.fleet])
 
     def place_ships(self):
         while any(count > 0 for (_, _, count, _) in self.ships_to_place.values()):
@@ -22,8 +30,16 @@ class Player:
             for key, (name, _, count, size) in self.ships_to_place.items():
                 if count > 0:
                     print(f"{key}. {name} (size {size}) - {count} left")
+            print("A. Auto-place remaining ships")
 
             choice = input("Choose ship number to place: ").strip()
+            if choice.upper() == "A":
+                try:
+                    self.auto_place_ships()
+                    self.board.display(hide_ships=False)
+                except ValueError as e:
+                    print(f"Error: {e}. Try again.")
+                continue
             if not choice.isdigit() or int(choice) not in self.ships_to_place:
                 print("Invalid choice, try again.")
                 continue
@@ -37,14 +53,12 @@ class Player:
             try:
                 pos = input(f"Enter start position for {name} (e.g., A5): ").upper().strip()
                 orientation = input("Orientation (H for Horizontal, V for Vertical): ").upper().strip()
-                row = int(pos[1]) 
-                col = ord(pos[0]) - ord('A')
+                row, col = parse_cell(pos, self.board.size)
 
                 ship = ship_class()
                 placed = ship.place_ship(row, col, orientation, self.board)
                 if placed:
                     print(f"{name} placed successfully!")
-                    self.ships_to_place[choice] = (name, ship_class, count - 1, size)
                     self.board.display(hide_ships=False)
                 else:
                     print("Invalid position. Try again.")
@@ -53,32 +67,38 @@ class Player:
 
 
 
+    def auto_place_ships(self, rng=None):
+        remaining = [(ship_class, count) for (_, ship_class, count, _) in self.ships_to_place.values() if count > 0]
+        random_fleet(self.board, remaining, rng)
+
     def make_attack(self, opponent):
         print(f"\n{self.name}, it's your turn to attack!")
+        size = opponent.board.size
+        last_row, last_column = size - 1, column_label(size - 1)
         while True:
             try:
-                row = int(input("Enter row to attack (0–9): "))
-                if not (0 <= row <= 9):
-                    print("Row must be between 0 and 9.")
+                row = int(input(f"Enter row to attack (0–{last_row}): "))
+                if not (0 <= row <= last_row):
+                    print(f"Row must be between 0 and {last_row}.")
                     continue
 
-                col_input = input("Enter column to attack (A–J): ").upper()
-                if col_input not in COLUMNS:
-                    print("Column must be a letter between A and J.")
+                col_input = input(f"Enter column to attack (A–{last_column}): ").upper().strip()
+                col = column_index(col_input) if col_input.isascii() and col_input.isalpha() else size
+                if col >= size:
+                    print(f"Column must be between A and {last_column}.")
                     continue
 
-                col = COLUMNS.index(col_input)
-                result = opponent.board.receive_attack(row, col)
+                result = self.fire(opponent, row, col)
 
-                if result == "repeat":
+                if result.outcome == "repeat":
                     print("Already attacked this position. Try again.")
                     continue
-                elif result == "hit":
+                elif result.sunk:
+                    print(f"Hit! You sunk {opponent.name}'s {result.ship.__class__.__name__}!")
+                elif result.outcome == "hit":
                     print("Hit!")
-                    self.opponent_board.grid[row][col] = "X"
-                elif result == "miss":
+                else:
                     print("Miss.")
-                    self.opponent_board.grid[row][col] = "O"
                 return result
 
             except ValueError:
@@ -86,19 +106,19 @@ class Player:
             except Exception as e:
                 print("Error during attack:", e)
 
+    def fire(self, opponent, row, col):
+        result = opponent.board.receive_attack(row, col)
+        if result.outcome != "repeat":
+            self.opponent_board.mark(row, col, result)
+            if self.move_log is not None:
+                self.move_log.attack(self, row, col, result)
+        return result
+
     def display_opponent_board(self):
         print(f"\n{self.name}'s view of the opponent's board:")
         self.opponent_board.display()
 
     def restart(self):
-        self.board = Board()
-        self.opponent_board = Board()
-        self.hits = 0
-        self.misses = 0
-        self.total_moves = 0
-        self.ships_to_place = {
-            1: ('Battleship', Battleship, 1, 4),
-            2: ('Cruiser', Cruiser, 2, 3),
-            3: ('Submarine', Submarine, 3, 2),
-            4: ('Destroyer', Destroyer, 4, 1),
-        }
+        board_class = type(self.board)
+        self.board = board_class(self.board.size, self.board.fleet)
+        self.opponent_board = board_class(self.opponent_board.size, self.opponent_board.fleet)
@@ -4,17 +4,40 @@ class Orientation(Enum):
     HORIZONTAL = 'H'
     VERTICAL = 'V'
 
+_VERTICAL = Orientation.VERTICAL
+
 class Ship:
-    placed_count = 0
-    max_allowed = 0
+    # Slotted, and cells are kept as the start cell plus orientation, so a
+    # ship costs a few machine words however many games are in flight
+    __slots__ = ("size", "hits", "start_row", "start_col", "is_placed", "orientation")
 
     def __init__(self, size):
         self.size = size
         self.hits = 0
-        self.position = []
+        self.start_row = None
+        self.start_col = None
         self.is_placed = False
         self.orientation = None
 
+    @property
+    def position(self):
+        row, col = self.start_row, self.start_col
+        if row is None:
+            return []
+        if self.orientation is _VERTICAL:
+            return [(row + i, col) for i in range(self.size)]
+        return [(row, col + i) for i in range(self.size)]
+
+    @position.setter
+    def position(self, positions):
+        if not positions:
+            self.start_row = self.start_col = None
+            return
+        self.start_row, self.start_col = positions[0]
+        if len(positions) > 1:
+            horizontal = positions[1][0] == positions[0][0]
+            self.orientation = Orientation.HORIZONTAL if horizontal else Orientation.VERTICAL
+
     def hit(self):
         self.hits += 1
 
@@ -23,8 +46,10 @@ class Ship:
 
     def place_ship(self, start_row, start_col, orientation, board):
         
-        if type(self).placed_count >= type(self).max_allowed:
-            raise ValueError(f"Cannot place more than {type(self).max_allowed} {self.__class__.__name__}(s)")
+        left = board.ships_left(type(self))
+        if left <= 0:
+            allowed = board.placed.get(type(self), 0) + left
+            raise ValueError(f"Cannot place more than {allowed} {self.__class__.__name__}(s)")
 
         if isinstance(orientation, Orientation):
             orientation = orientation.value
@@ -32,72 +57,50 @@ class Ship:
         if orientation not in ["H", "V"]:
             raise ValueError("Orientation must be 'H' or 'V'")
 
-        positions = []
-
-        for i in range(self.size):
-            row = start_row + (i if orientation == "V" else 0)
-            col = start_col + (i if orientation == "H" else 0)
-
-            if not (0 <= row <= 9 and 0 <= col <= 9):
-                raise ValueError("Ship placement is out of board bounds")
-
-            
-            for r in range(row - 1, row + 2):
-                for c in range(col - 1, col + 2):
-                    if 0 <= r <= 9 and 0 <= c <= 9:
-                        if board.grid[r][c] != "~":
-                            raise ValueError("Ships cannot touch each other, even diagonally")
+        if board.placement.footprint(self.size, orientation, start_row, start_col) is None:
+            raise ValueError("Ship placement is out of board bounds")
 
-            positions.append((row, col))
+        if not board.can_place(self.size, orientation, start_row, start_col):
+            raise ValueError("Ships cannot touch each other, even diagonally")
 
-        
-        for row, col in positions:
-            board.grid[row][col] = "S"
+        board.place_ships(self, self.cells(start_row, start_col, orientation))
 
-        self.position = positions
         self.orientation = Orientation(orientation)
         self.is_placed = True
 
-        
-        type(self).placed_count += 1
-
         return True
 
+    def cells(self, start_row, start_col, orientation):
+        if orientation == "V":
+            return [(start_row + i, start_col) for i in range(self.size)]
+        return [(start_row, start_col + i) for i in range(self.size)]
+
     def get_positions(self):
         return self.position
 
     def __str__(self):
         return f"{self.__class__.__name__} at {self.position}, hits: {self.hits}"
 
-    @classmethod
-    def reset_counters(cls):
-        for ship_class in [Battleship, Cruiser, Submarine, Destroyer]:
-            ship_class.placed_count = 0
-
 class Battleship(Ship):
-    placed_count = 0
-    max_allowed = 1
+    __slots__ = ()
 
     def __init__(self):
         super().__init__(size=4)
 
 class Cruiser(Ship):
-    placed_count = 0
-    max_allowed = 2
+    __slots__ = ()
 
     def __init__(self):
         super().__init__(size=3)
 
 class Submarine(Ship):
-    placed_count = 0
-    max_allowed = 3
+    __slots__ = ()
 
     def __init__(self):
         super().__init__(size=2)
 
 class Destroyer(Ship):
-    placed_count = 0
-    max_allowed = 4
+    __slots__ = ()
 
     def __init__(self):
         super().__init__(size=1)
@@ -0,0 +1,77 @@
+from Board import AttackResult, Board
+from config import scaled_fleet
+from placement import placement_for
+
+
+class SparseBoard(Board):
+    """Board that stores only ship, hit and miss cells, in hash sets.
+
+    Untouched water takes no memory, so a board costs space in proportion
+    to its ships and shots rather than its area, and creating one does not
+    depend on its size. Cells are keyed by their index ``row * size + col``,
+    as in :class:`BitBoard`, and ``grid`` is rendered on demand. The public API and
+    the "hit"/"miss"/"repeat" results are the same as :class:`Board`.
+    """
+
+    __slots__ = ("hits", "misses")
+
+    def __init__(self, size=10, fleet=None):
+        self.size = size
+        self.fleet = fleet or scaled_fleet(size)
+        self.ship_at = {}
+        self.hits = set()
+        self.misses = set()
+        self.ships = []
+        self.placed = {}
+        self.sunk = []
+        self.remaining = 0
+        self.placement = placement_for(size)
+        self.forbidden = self.placement.empty_zone()
+        self.validity = {}
+
+    @property
+    def grid(self):
+        return [[self.cell(r, c) for c in range(self.size)] for r in range(self.size)]
+
+    def cell(self, row, col):
+        key = row * self.size + col
+        if key in self.hits:
+            return "X"
+        if key in self.misses:
+            return "O"
+        if key in self.ship_at:
+            return "S"
+        return "~"
+
+    def mark(self, row, col, result):
+        key = row * self.size + col
+        if result.outcome == "hit":
+            self.hits.add(key)
+        else:
+            self.misses.add(key)
+        if result.sunk:
+            self.sunk.append(result.ship)
+
+    def place_ships(self, ship, positions):
+
+        for row, col in positions:
+            self.ship_at[row * self.size + col] = ship
+        self.forbidden |= self.placement.zone(positions)
+        self.validity.clear()
+        ship.is_placed = True
+        ship.position = positions
+        self.ships.append(ship)
+        self.placed[type(ship)] = self.placed.get(type(ship), 0) + 1
+        self.remaining += 1
+
+    def receive_attack(self, row, col):
+
+        key = row * self.size + col
+        if key in self.hits or key in self.misses:
+            return AttackResult("repeat", None, False, self.remaining)
+        ship = self.ship_at.get(key)
+        if ship is not None:
+            self.hits.add(key)
+            return self._register_hit(ship)
+        self.misses.add(key)
+        return AttackResult("miss", None, False, self.remaining)
@@ -0,0 +1,248 @@
+"""Lockstep engine that plays N games at once as stacked NumPy arrays.
+
+Every game is one strategy firing at one fleet. The state of all games
+lives in ``(N, size, size)`` arrays and each :meth:`BatchEngine.step`
+fires one shot in every unfinished game with a handful of vectorized
+operations. Finished games are swapped behind the unfinished ones, so the
+arrays are never reallocated or copied.
+
+A batched strategy is a callable ``strategy(view, rng) -> (rows, cols)``:
+``view`` is an ``(M, size, size)`` int8 array of the active games (0
+unknown, 1 miss, 2 hit, 3 sunk ship), ``rng`` a ``numpy.random.Generator``,
+and the result two length-M integer arrays.
+
+Two-player games need no second board in the batch. A hit keeps the turn,
+so a player finishes in turn ``misses + 1``, and the player who opens
+wins exactly when they needed no more misses than their opponent; see
+:func:`winners`.
+
+    python batch.py --games 1000 10000 100000 --strategy hunt_target
+"""
+import time
+
+import numpy as np
+
+from config import BOARD_SIZE, scaled_fleet
+from fleet import random_layouts
+
+UNKNOWN, MISS, HIT, SUNK = range(4)
+# Distinct layouts drawn per batch; games reuse them under the 8 board symmetries
+LAYOUT_POOL = 2048
+
+
+def layout_grids(count, size=BOARD_SIZE, fleet=None, seed=None):
+    """``(count, size, size)`` int8 ship ids (-1 for water) and each ship's length.
+
+    Up to :data:`LAYOUT_POOL` layouts are drawn with :func:`fleet.random_layouts`
+    and every game gets one of them under a random rotation or reflection,
+    which keeps the no-touch rule and the fleet. The draws follow the
+    game's own random-fleet distribution, which is symmetric under those
+    transformations but not uniform over layouts (see :mod:`fleet`).
+    """
+    layouts = random_layouts(min(count, LAYOUT_POOL), size, fleet or scaled_fleet(size), seed)
+    lengths = np.array([ship_class().size for ship_class, _, _, _ in layouts[0]], dtype=np.int16)
+    pool = np.full((len(layouts), size, size), -1, dtype=np.int8 if len(lengths) < 128 else np.int32)
+    for index, layout in enumerate(layouts):
+        for ship, (ship_class, orientation, row, col) in enumerate(layout):
+            length = lengths[ship]
+            if orientation == "V":
+                pool[index, row:row + length, col] = ship
+            else:
+                pool[index, row, col:col + length] = ship
+    rng = np.random.default_rng(seed)
+    source = rng.integers(len(pool), size=count)
+    symmetry = rng.integers(8, size=count)
+    grids = np.empty((count, size, size), dtype=pool.dtype)
+    for transform in range(8):
+        games = np.flatnonzero(symmetry == transform)
+        boards = np.rot90(pool[source[games]], transform % 4, axes=(1, 2))
+        grids[games] = boards[:, :, ::-1] if transform >= 4 else boards
+    return grids, lengths
+
+
+class BatchEngine:
+    """State of N games in slots; the first ``count`` slots hold the unfinished games.
+
+    A finished game swaps places with an unfinished one from the end of
+    the active range, so the active games are always a contiguous prefix
+    and strategies get views of the arrays rather than copies. ``game``
+    maps each slot back to its game number.
+    """
+
+    def __init__(self, games, size=BOARD_SIZE, fleet=None, seed=None):
+        self.size = size
+        self.ship_id, self.lengths = layout_grids(games, size, fleet, seed)
+        self.view = np.zeros((games, size, size), dtype=np.int8)
+        self.cells_left = np.tile(self.lengths, (games, 1))
+        self.remaining = np.full(games, len(self.lengths), dtype=np.int16)
+        self.shots = np.zeros(games, dtype=np.int32)
+        self.misses = np.zeros(games, dtype=np.int32)
+        self.game = np.arange(games)
+        self.count = games
+        self.rng = np.random.default_rng(seed)
+        self._slots = np.arange(games)
+
+    def __len__(self):
+        return len(self.game)
+
+    def step(self, strategy):
+        """Fire one shot in every unfinished game; returns the numbers of the games that just finished."""
+        n = self.count
+        slots = self._slots[:n]
+        view = self.view[:n]
+        rows, cols = strategy(view, self.rng)
+        ship = self.ship_id[slots, rows, cols].astype(np.intp)
+        fresh = view[slots, rows, cols] == UNKNOWN
+        hit = fresh & (ship >= 0)
+        # A repeated cell counts as a miss, as it ends the turn in a two-player game
+        water = fresh & ~hit
+        view[slots[water], rows[water], cols[water]] = MISS
+        hit_slots, hit_ships = slots[hit], ship[hit]
+        view[hit_slots, rows[hit], cols[hit]] = HIT
+        self.cells_left[hit_slots, hit_ships] -= 1
+        sunk = self.cells_left[hit_slots, hit_ships] == 0
+        if sunk.any():
+            sunk_slots, sunk_ships = hit_slots[sunk], hit_ships[sunk]
+            cells = self.ship_id[sunk_slots] == sunk_ships[:, None, None]
+            view[sunk_slots] = np.where(cells, SUNK, view[sunk_slots])
+            self.remaining[sunk_slots] -= 1
+        self.shots[:n] += 1
+        self.misses[:n] += ~hit
+        done = self.remaining[:n] == 0
+        finished = self.game[:n][done]
+        if len(finished):
+            self._retire(done)
+        return finished
+
+    def _retire(self, done):
+        # Swap finished games in the active range with unfinished ones past its new end
+        n = self.count
+        new_count = n - int(done.sum())
+        holes = np.flatnonzero(done[:new_count])
+        fillers = new_count + np.flatnonzero(~done[new_count:])
+        if len(holes):
+            for array in (self.ship_id, self.view, self.cells_left, self.remaining, self.shots, self.misses, self.game):
+                array[holes], array[fillers] = array[fillers], array[holes]
+        self.count = new_count
+
+    def run(self, strategy, max_steps=None):
+        """Step until every game is finished (or ``max_steps``); returns the shots per game."""
+        max_steps = max_steps or 2 * self.size * self.size
+        for _ in range(max_steps):
+            if not self.count:
+                break
+            self.step(strategy)
+        return self.results()['shots']
+
+    def results(self):
+        """Shots, misses and whether it finished, per game, in game order."""
+        order = np.argsort(self.game)
+        return {
+            'shots': self.shots[order],
+            'misses': self.misses[order],
+            'finished': self.remaining[order] == 0,
+        }
+
+
+def winners(misses1, misses2, first=0):
+    """Winner (0 or 1) of each two-player game between the boards' shooters.
+
+    ``misses1[i]`` and ``misses2[i]`` are the misses each player needed
+    against the other's fleet; ``first`` is who opens (scalar or array).
+    """
+    first = np.broadcast_to(first, np.shape(misses1))
+    opener_wins = np.where(first == 0, misses1 <= misses2, misses2 <= misses1)
+    return np.where(opener_wins, first, 1 - first)
+
+
+def _noise(rng, shape):
+    # Random bytes straight from the bit generator; much cheaper than rng.random
+    count = int(np.prod(shape))
+    raw = rng.bit_generator.random_raw((count + 7) // 8).view(np.uint8)
+    return raw[:count].reshape(shape)
+
+
+def _unknown_choice(scores, view):
+    # Highest-scoring unknown cell of every game; scores are uint8, updated in place, and unknown cells score above 0
+    scores *= view == UNKNOWN
+    flat = scores.reshape(len(view), -1).argmax(axis=1)
+    return np.divmod(flat, view.shape[2])
+
+
+def random_batch_strategy(view, rng):
+    return _unknown_choice(_noise(rng, view.shape) | 1, view)
+
+
+_HUNT_BASE = {}
+
+
+def hunt_target_batch_strategy(view, rng):
+    """Fire next to unsunk hits first, otherwise hunt on a checkerboard."""
+    size = view.shape[1]
+    base = _HUNT_BASE.get(size)
+    if base is None:
+        # +32 for any unknown cell, +64 more on the checkerboard
+        parity = np.add.outer(np.arange(size), np.arange(size)) % 2 == 0
+        base = _HUNT_BASE[size] = (32 + 64 * parity).astype(np.uint8)
+    hits = view == HIT
+    near = np.zeros_like(hits)
+    near[:, 1:] |= hits[:, :-1]
+    near[:, :-1] |= hits[:, 1:]
+    near[:, :, 1:] |= hits[:, :, :-1]
+    near[:, :, :-1] |= hits[:, :, 1:]
+    # 0-31 random tie-break on top, +128 next to a hit
+    scores = _noise(rng, view.shape) >> 3
+    scores += base
+    scores |= near.view(np.uint8) << 7
+    return _unknown_choice(scores, view)
+
+
+BATCH_STRATEGIES = {
+    'random': random_batch_strategy,
+    'hunt_target': hunt_target_batch_strategy,
+}
+
+
+def measure(games, strategy, size=BOARD_SIZE, seed=0):
+    start = time.perf_counter()
+    engine = BatchEngine(games, size, seed=seed)
+    setup = time.perf_counter() - start
+    start = time.perf_counter()
+    shots = engine.run(strategy)
+    elapsed = time.perf_counter() - start
+    return {
+        'games': games,
+        'setup': setup,
+        'elapsed': elapsed,
+        'games_per_second': games / elapsed if elapsed else 0.0,
+        'mean_shots': float(shots.mean()),
+        'unfinished': engine.count,
+    }
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Play Battleship games in lockstep batches with NumPy")
+    parser.add_argument("--games", type=int, nargs="+", default=[1000, 10000, 100000], help="batch sizes to time")
+    parser.add_argument("--strategy", choices=BATCH_STRATEGIES, default="hunt_target")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for games in args.games:
+        result = measure(games, BATCH_STRATEGIES[args.strategy], args.size, args.seed)
+        results.append(result)
+        print(f"N={games:<8} {result['games_per_second']:>12,.0f} games/sec  "
+              f"(run {result['elapsed']:.2f}s, setup {result['setup']:.2f}s, mean {result['mean_shots']:.1f} shots)")
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({'strategy': args.strategy, 'size': args.size, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
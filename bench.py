@@ -0,0 +1,412 @@
+"""Benchmarks for the core game primitives and complete games.
+
+Each case prepares its state outside the timed region, then runs
+``number`` operations per repeat. After the warmup repeats, per-operation
+times are summarised as median, p95, mean and min. Results can be written
+as JSON and compared against a saved baseline:
+
+    python bench.py --save baseline.json
+    python bench.py --baseline baseline.json --threshold 0.10
+
+The process exits with status 1 if any case's median got slower than the
+baseline by more than the threshold, and with status 2 without comparing
+if the baseline used a different board, interpreter, repeats, warmup or
+scale.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from Board import Board
+from BitBoard import BitBoard
+from SparseBoard import SparseBoard
+from Player import Player
+from Ship import Battleship
+from fleet import random_fleet, random_layouts, place_fleet
+from simulation import play_game, hunt_target_strategy
+from snapshot import snapshot, restore
+
+BOARD_CLASSES = {'list': Board, 'bit': BitBoard, 'sparse': SparseBoard}
+# Report settings a baseline must share for its medians to be comparable
+RUN_SETTINGS = ('implementation', 'board', 'repeats', 'warmup', 'scale')
+LARGE_SIZE = 1000
+_large_boards = {}
+
+
+def _fleet_boards(board_class, count, seed=0):
+    layouts = random_layouts(count, seed=seed)
+    boards = []
+    for layout in layouts:
+        board = board_class()
+        place_fleet(board, layout)
+        boards.append(board)
+    return boards
+
+
+def case_place_ship(board_class, number):
+    boards = [board_class() for _ in range(number)]
+
+    def run():
+        for board in boards:
+            Battleship().place_ship(3, 3, "H", board)
+    return run
+
+
+def case_receive_attack(board_class, number):
+    # One operation is one shot; boards are swept cell by cell, the last one only partly
+    cells = [(r, c) for r in range(10) for c in range(10)]
+    boards = _fleet_boards(board_class, -(-number // len(cells)))
+    sweeps = [(board, cells[:number - index * len(cells)]) for index, board in enumerate(boards)]
+
+    def run():
+        for board, board_cells in sweeps:
+            for row, col in board_cells:
+                board.receive_attack(row, col)
+    return run
+
+
+def case_all_ships_sunk(board_class, number):
+    board = _fleet_boards(board_class, 1)[0]
+    for r in range(0, 10, 2):
+        for c in range(10):
+            board.receive_attack(r, c)
+
+    def run():
+        for _ in range(number):
+            board.all_ships_sunk()
+    return run
+
+
+def case_fleet_placement(board_class, number):
+    rng = random.Random(0)
+
+    def run():
+        for _ in range(number):
+            random_fleet(board_class(), rng=rng)
+    return run
+
+
+def case_headless_game(board_class, number):
+    def run():
+        for seed in range(number):
+            play_game(hunt_target_strategy, hunt_target_strategy, seed, board_class)
+    return run
+
+
+def _large_board(board_class):
+    # One 1000x1000 board with the scaled fleet, built once and shared by the large-board cases
+    if board_class is BitBoard:
+        raise ValueError("BitBoard masks grow with the board's area; use Board or SparseBoard")
+    board = _large_boards.get(board_class)
+    if board is None:
+        board = _large_boards[board_class] = random_fleet(board_class(LARGE_SIZE), rng=random.Random(0))
+    return board
+
+
+def case_large_construct(board_class, number):
+    if board_class is BitBoard:
+        raise ValueError("BitBoard masks grow with the board's area; use Board or SparseBoard")
+    boards = []
+
+    def run():
+        for _ in range(number):
+            boards.append(board_class(LARGE_SIZE))
+    # Freeing the boards is left out of the timing
+    run.close = boards.clear
+    return run
+
+
+def case_large_can_place(board_class, number):
+    board = _large_board(board_class)
+    rng = random.Random(0)
+    anchors = [(rng.randrange(LARGE_SIZE), rng.randrange(LARGE_SIZE), rng.choice("HV")) for _ in range(number)]
+
+    def run():
+        for row, col, orientation in anchors:
+            board.can_place(4, orientation, row, col)
+    return run
+
+
+def case_large_receive_attack(board_class, number):
+    board = _large_board(board_class)
+    rng = random.Random(0)
+    cells = [(rng.randrange(LARGE_SIZE), rng.randrange(LARGE_SIZE)) for _ in range(number)]
+
+    def run():
+        for row, col in cells:
+            board.receive_attack(row, col)
+    return run
+
+
+def case_large_all_ships_sunk(board_class, number):
+    board = _large_board(board_class)
+
+    def run():
+        for _ in range(number):
+            board.all_ships_sunk()
+    return run
+
+
+def _mid_game_players(board_class):
+    boards = _fleet_boards(board_class, 4)
+    player1 = Player("Player 1", boards[0], boards[1])
+    player2 = Player("Player 2", boards[2], boards[3])
+    rng = random.Random(0)
+    for _ in range(40):
+        player1.fire(player2, rng.randrange(10), rng.randrange(10))
+        player2.fire(player1, rng.randrange(10), rng.randrange(10))
+    return player1, player2
+
+
+def case_snapshot(board_class, number):
+    player1, player2 = _mid_game_players(board_class)
+
+    def run():
+        for _ in range(number):
+            snapshot(player1, player2, turn=1)
+    return run
+
+
+def case_restore(board_class, number):
+    data = snapshot(*_mid_game_players(board_class), turn=1)
+
+    def run():
+        for _ in range(number):
+            restore(data, board_class)
+    return run
+
+
+def case_draw_boards(board_class, number):
+    # Needs a display, Tk and Pillow; skipped otherwise
+    import tkinter as tk
+    from gui_test import BattleshipGUI
+
+    root = tk.Tk()
+    root.withdraw()
+    gui = BattleshipGUI(root, board_class=board_class)
+    gui.start_game()
+    rng = random.Random(0)
+    for player in (gui.player1, gui.player2):
+        random_fleet(player.board, rng=rng)
+    gui.phase = "battle"
+    for _ in range(30):
+        gui.player1.fire(gui.player2, rng.randrange(10), rng.randrange(10))
+
+    def run():
+        for _ in range(number):
+            gui.draw_boards()
+            root.update_idletasks()
+    run.close = root.destroy
+    return run
+
+
+def _sprite_case(number, warm):
+    # Needs Pillow and the assets next to this file; loads every GUI sprite variant without creating Tk images
+    import shutil
+    import tempfile
+    from gui_test import CELL_SIZE, GRID_SIZE, SHIP_CLASSES
+    from sprites import time_startup
+
+    ships = [(name, size, image_file) for name, (_, _, size, image_file) in SHIP_CLASSES.items()]
+    asset_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+    cache_dir = tempfile.mkdtemp(prefix="battleship-bench-")
+    try:
+        # Also fails the case up front when the assets cannot be loaded
+        time_startup(cache_dir, CELL_SIZE, GRID_SIZE, ships, asset_dir)
+    except OSError:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        raise
+
+    def run():
+        for _ in range(number):
+            if not warm:
+                shutil.rmtree(cache_dir, ignore_errors=True)
+            time_startup(cache_dir, CELL_SIZE, GRID_SIZE, ships, asset_dir)
+    run.close = lambda: shutil.rmtree(cache_dir, ignore_errors=True)
+    return run
+
+
+def case_sprites_cold(board_class, number):
+    return _sprite_case(number, warm=False)
+
+
+def case_sprites_warm(board_class, number):
+    return _sprite_case(number, warm=True)
+
+
+CASES = {
+    'place_ship': (case_place_ship, 2000),
+    'receive_attack': (case_receive_attack, 5000),
+    'all_ships_sunk': (case_all_ships_sunk, 5000),
+    'fleet_placement': (case_fleet_placement, 200),
+    'headless_game': (case_headless_game, 10),
+    'large_construct': (case_large_construct, 3),
+    'large_can_place': (case_large_can_place, 5000),
+    'large_receive_attack': (case_large_receive_attack, 5000),
+    'large_all_ships_sunk': (case_large_all_ships_sunk, 5000),
+    'snapshot': (case_snapshot, 1000),
+    'restore': (case_restore, 200),
+    'draw_boards': (case_draw_boards, 5),
+    'sprites_cold': (case_sprites_cold, 2),
+    'sprites_warm': (case_sprites_warm, 5),
+}
+
+
+def _game_in_flight(board_class, seed, shots):
+    # Two players with placed fleets, ``shots`` shots into the game each
+    rng = random.Random(seed)
+    players = [Player(f"Player {index + 1}", random_fleet(board_class(), rng=rng), board_class())
+               for index in range(2)]
+    for _ in range(shots):
+        players[0].fire(players[1], rng.randrange(10), rng.randrange(10))
+        players[1].fire(players[0], rng.randrange(10), rng.randrange(10))
+    return players
+
+
+def measure_memory(board_class, games=2000, shots=30):
+    """Bytes allocated per in-flight game, averaged over ``games`` live games."""
+    # Shared placement tables and class caches are built before tracing starts
+    _game_in_flight(board_class, -1, shots)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        live = [_game_in_flight(board_class, seed, shots) for seed in range(games)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del live
+    return {'games': games, 'shots': shots, 'bytes_per_game': (after - before) / games}
+
+
+def measure(case, board_class, number, repeats, warmup):
+    samples = []
+    for index in range(warmup + repeats):
+        run = case(board_class, number)
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if hasattr(run, 'close'):
+            run.close()
+        if index >= warmup:
+            samples.append(elapsed / number)
+    samples.sort()
+    return {
+        'number': number,
+        'repeats': repeats,
+        'median': statistics.median(samples),
+        'p95': samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        'mean': statistics.fmean(samples),
+        'min': samples[0],
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def run_suite(names=None, board='list', repeats=7, warmup=2, scale=1.0, log=print):
+    board_class = BOARD_CLASSES[board]
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'board': board,
+            'repeats': repeats,
+            'warmup': warmup,
+            'scale': scale,
+        },
+        'results': {},
+        'skipped': {},
+    }
+    for name in names or CASES:
+        case, number = CASES[name]
+        number = max(int(number * scale), 1)
+        try:
+            stats = measure(case, board_class, number, repeats, warmup)
+        except Exception as e:
+            report['skipped'][name] = f"{type(e).__name__}: {e}"
+            log(f"{name:<22} skipped ({e})")
+            continue
+        report['results'][name] = stats
+        log(f"{name:<22} median {_format(stats['median'])}  p95 {_format(stats['p95'])}  min {_format(stats['min'])}")
+    return report
+
+
+def compare(report, baseline, threshold):
+    """Return a list of ``(name, baseline_median, median, change)`` regressions.
+
+    Raises ``ValueError`` if the baseline was run with different
+    :data:`RUN_SETTINGS`; settings missing from an older baseline are not checked.
+    """
+    meta, old_meta = report.get('meta', {}), baseline.get('meta', {})
+    different = [f"{key} {old_meta[key]} -> {meta.get(key)}"
+                 for key in RUN_SETTINGS if key in old_meta and old_meta[key] != meta.get(key)]
+    if different:
+        raise ValueError(f"baseline was run with different settings ({', '.join(different)})")
+    regressions = []
+    for name, stats in report['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if not old:
+            continue
+        change = stats['median'] / old['median'] - 1
+        if change > threshold:
+            regressions.append((name, old['median'], stats['median'], change))
+    return regressions
+
+
+def _format(seconds):
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:9.3f} ms"
+    if seconds >= 1e-6:
+        return f"{seconds * 1e6:9.3f} us"
+    return f"{seconds * 1e9:9.1f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Battleship game primitives")
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("--board", choices=BOARD_CLASSES, default="list")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply operations per repeat")
+    parser.add_argument("--memory", action="store_true", help="also measure memory per in-flight game")
+    parser.add_argument("--json", dest="json_path", help="write the report to this file")
+    parser.add_argument("--save", help="alias for --json, for saving a baseline")
+    parser.add_argument("--baseline", help="compare against a saved report")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed median slowdown (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    report = run_suite(args.cases or None, args.board, args.repeats, args.warmup, args.scale)
+    if args.memory:
+        report['memory'] = measure_memory(BOARD_CLASSES[args.board])
+        print(f"{'memory_per_game':<22} {report['memory']['bytes_per_game'] / 1024:9.2f} KiB")
+    path = args.json_path or args.save
+    if path:
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        try:
+            regressions = compare(report, baseline, args.threshold)
+        except ValueError as e:
+            print(f"Not comparing: {e}")
+            return 2
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: {_format(old).strip()} -> {_format(new).strip()} (+{change:.1%})")
+        if regressions:
+            return 1
+        print(f"No regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
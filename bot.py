@@ -0,0 +1,207 @@
+"""Computer opponent that fires at the cell most likely to hold a ship.
+
+For every remaining enemy ship size the bot counts, with NumPy
+sliding-window sums (prefix-sum differences) over the observed grid, how many legal placements cover each
+cell. Placements that pass through unsunk hits are weighted up so the bot
+finishes off ships it has found before hunting for new ones.
+"""
+import random
+
+import numpy as np
+
+from BitBoard import BitBoard
+from SparseBoard import SparseBoard
+from Player import Player
+from config import column_label, ship_size
+
+_FLEET_SIZES = {}
+HIT_WEIGHT = 50
+
+
+UNKNOWN, MISS, HIT, SUNK = range(4)
+
+
+def observed_masks(view):
+    """Return (hits, blocked) boolean arrays for an opponent view board.
+
+    ``hits`` marks hits on ships that are still afloat. ``blocked`` marks
+    cells no remaining ship can occupy: misses, sunk ships and the cells
+    around them, and the diagonal neighbours of unsunk hits.
+    """
+    hits, misses, sunk = _observed(view)
+    return hits, misses | _dilate(sunk) | _diagonals(hits)
+
+
+def observed_state(view):
+    """``(size, size)`` uint8 grid of the view: UNKNOWN, MISS, HIT (ship still afloat) or SUNK."""
+    hits, misses, sunk = _observed(view)
+    state = misses.view(np.uint8).copy()
+    state[hits] = HIT
+    state[sunk] = SUNK
+    return state
+
+
+def state_masks(state):
+    """:func:`observed_masks` for a grid from :func:`observed_state`."""
+    hits = state == HIT
+    return hits, (state == MISS) | _dilate(state == SUNK) | _diagonals(hits)
+
+
+def _observed(view):
+    size = view.size
+    if isinstance(view, BitBoard):
+        hits = _unpack(view.hit_mask, size)
+        misses = _unpack(view.miss_mask, size)
+    elif isinstance(view, SparseBoard):
+        hits = _from_cells(view.hits, size)
+        misses = _from_cells(view.misses, size)
+    else:
+        # One bytes object for the whole grid is far cheaper than np.array over nested lists
+        text = "".join(map("".join, view.grid)).encode("ascii")
+        grid = np.frombuffer(text, dtype=np.uint8).reshape(size, size)
+        hits = grid == ord("X")
+        misses = grid == ord("O")
+    sunk = np.zeros((size, size), dtype=bool)
+    for ship in view.sunk:
+        for r, c in ship.position:
+            sunk[r, c] = True
+    hits &= ~sunk
+    return hits, misses, sunk
+
+
+def _unpack(mask, size):
+    cells = size * size
+    raw = np.frombuffer(mask.to_bytes((cells + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:cells].astype(bool).reshape(size, size)
+
+
+def _from_cells(cells, size):
+    # Cell indices (row * size + col) to a boolean grid
+    mask = np.zeros(size * size, dtype=bool)
+    mask[np.fromiter(cells, dtype=np.intp, count=len(cells))] = True
+    return mask.reshape(size, size)
+
+
+def _dilate(mask):
+    padded = np.pad(mask, 1)
+    size = mask.shape[0]
+    out = np.zeros_like(mask)
+    for dr in range(3):
+        for dc in range(3):
+            out |= padded[dr:dr + size, dc:dc + size]
+    return out
+
+
+def _diagonals(mask):
+    padded = np.pad(mask, 1)
+    size = mask.shape[0]
+    return (padded[:size, :size] | padded[:size, 2:] | padded[2:, :size] | padded[2:, 2:])
+
+
+def fleet_sizes(fleet):
+    # Ship lengths of a fleet, one entry per ship
+    sizes = _FLEET_SIZES.get(fleet)
+    if sizes is None:
+        sizes = _FLEET_SIZES[fleet] = [ship_size(ship_class) for ship_class, count in fleet for _ in range(count)]
+    return sizes
+
+
+def remaining_sizes(view):
+    # The view board carries the fleet the game is played with
+    sizes = list(fleet_sizes(view.fleet))
+    for ship in view.sunk:
+        sizes.remove(ship.size)
+    return sizes
+
+
+def density_map(view, sizes=None):
+    """Weighted count of legal placements covering every cell of ``view``."""
+    if sizes is None:
+        sizes = remaining_sizes(view)
+    return _density(*observed_masks(view), sizes)
+
+
+def state_density(state, sizes):
+    """:func:`density_map` for a grid from :func:`observed_state` and the remaining ship sizes."""
+    return _density(*state_masks(state), sizes)
+
+
+def _density(hits, blocked, sizes):
+    size = hits.shape[0]
+    counts = {length: sizes.count(length) for length in set(sizes) if length <= size}
+    hits_i = hits.astype(np.int32)
+    blocked_i = blocked.astype(np.int32)
+    density = _line_density(blocked_i, hits_i, counts)
+    density += _line_density(blocked_i.T, hits_i.T, counts).T
+    # Attacked cells are either unsunk hits or blocked
+    density[hits | blocked] = 0
+    return density
+
+
+def _line_density(blocked, hits, counts):
+    # Horizontal placements only; vertical ones are the same on the transpose.
+    # Window sums come from prefix sums along each row: window = cs[L:] - cs[:-L]
+    rows, cols = blocked.shape
+    zeros = np.zeros((rows, 1), dtype=np.int64)
+    blocked_cs = np.hstack((zeros, blocked.cumsum(axis=1)))
+    hits_cs = np.hstack((zeros, hits.cumsum(axis=1)))
+    density = np.zeros((rows, cols), dtype=np.int64)
+    for length, count in counts.items():
+        free = blocked_cs[:, length:] == blocked_cs[:, :-length]
+        covered = hits_cs[:, length:] - hits_cs[:, :-length]
+        weight = free * (1 + HIT_WEIGHT * covered) * count
+        # Cell c is covered by the placements starting in [c - length + 1, c]
+        weight_cs = np.hstack((zeros, weight.cumsum(axis=1)))
+        upper, lower = _spread_index(cols, length)
+        density += weight_cs[:, upper] - weight_cs[:, lower]
+    return density
+
+
+_spread_cache = {}
+
+
+def _spread_index(cols, length):
+    index = _spread_cache.get((cols, length))
+    if index is None:
+        cells = np.arange(cols)
+        index = _spread_cache[(cols, length)] = (np.minimum(cells, cols - length) + 1,
+                                                  np.maximum(cells - length + 1, 0))
+    return index
+
+
+def density_strategy(view, rng, cache=None):
+    # ``cache`` is an optional mapcache.DensityCache
+    density = density_map(view) if cache is None else cache.density_map(view)
+    best = density.max()
+    if best == 0:
+        candidates = [(r, c) for r in range(view.size) for c in range(view.size) if view.cell(r, c) == "~"]
+        return rng.choice(candidates)
+    rows, cols = np.nonzero(density == best)
+    pick = rng.randrange(len(rows))
+    return int(rows[pick]), int(cols[pick])
+
+
+class DensityBot(Player):
+    __slots__ = ("rng",)
+
+    def __init__(self, name, board, opponent_board, seed=None, fleet=None):
+        super().__init__(name, board, opponent_board, fleet)
+        self.rng = random.Random(seed)
+
+    def place_ships(self):
+        self.auto_place_ships(self.rng)
+
+    def choose_target(self):
+        return density_strategy(self.opponent_board, self.rng)
+
+    def make_attack(self, opponent):
+        row, col = self.choose_target()
+        result = self.fire(opponent, row, col)
+        target = f"{column_label(col)}{row}"
+        if result.sunk:
+            print(f"{self.name} fires at {target}: Hit! {self.name} sunk your {result.ship.__class__.__name__}!")
+        elif result.outcome == "hit":
+            print(f"{self.name} fires at {target}: Hit!")
+        else:
+            print(f"{self.name} fires at {target}: Miss.")
+        return result
@@ -0,0 +1,91 @@
+"""Board size and fleet composition shared by every module.
+
+A fleet is a tuple of ``(ship class, count)`` pairs. The standard game is
+a 10x10 board with the fleet below; :func:`scaled_fleet` grows it with the
+board's area, so a 100x100 board gets 100 times as many of each ship and
+keeps the same share of ship cells.
+
+Columns are labelled like spreadsheet columns (A..Z, AA, AB, ...) and rows
+are numbered from 0, so cells read "C7" or "AB120".
+"""
+from Ship import Battleship, Cruiser, Submarine, Destroyer
+
+BOARD_SIZE = 10
+FLEET = ((Battleship, 1), (Cruiser, 2), (Submarine, 3), (Destroyer, 4))
+# Boards up to this size keep placement zones as integer bitmasks; larger
+# boards use sets of cell indices (see placement.py)
+MASK_BOARD_LIMIT = 32
+
+# Fleets and their placement menus are immutable and shared by every player
+_SCALED_FLEETS = {}
+_FLEET_SPECS = {}
+
+
+def scaled_fleet(size, fleet=FLEET, base=BOARD_SIZE):
+    key = (size, fleet, base)
+    scaled = _SCALED_FLEETS.get(key)
+    if scaled is None:
+        factor = max(1, (size * size) // (base * base))
+        scaled = _SCALED_FLEETS[key] = tuple((ship_class, count * factor) for ship_class, count in fleet)
+    return scaled
+
+
+def ship_size(ship_class):
+    return ship_class().size
+
+
+def ship_types(fleet=FLEET):
+    return {ship_class.__name__: ship_class for ship_class, _ in fleet}
+
+
+def fleet_spec(fleet=FLEET):
+    # Menu entries for manual placement: (name, class, count, size) per ship class
+    spec = _FLEET_SPECS.get(fleet)
+    if spec is None:
+        spec = _FLEET_SPECS[fleet] = tuple((ship_class.__name__, ship_class, count, ship_size(ship_class))
+                                           for ship_class, count in fleet)
+    return spec
+
+
+def ships_to_place(fleet=FLEET, left=None):
+    # number -> (name, class, count left, size); ``left`` overrides the counts
+    spec = fleet_spec(fleet)
+    if left is None:
+        left = [count for _, _, count, _ in spec]
+    return {key: (name, ship_class, count, size)
+            for key, ((name, ship_class, _, size), count) in enumerate(zip(spec, left), 1)}
+
+
+def describe_fleet(fleet=FLEET):
+    return ", ".join(f"{count} {ship_class.__name__}({ship_size(ship_class)})" for ship_class, count in fleet)
+
+
+def column_label(index):
+    label = ""
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        label = chr(ord('A') + rest) + label
+    return label
+
+
+def column_index(label):
+    label = label.strip().upper()
+    if not label or not all('A' <= letter <= 'Z' for letter in label):
+        raise ValueError(f"Invalid column {label!r}")
+    index = 0
+    for letter in label:
+        index = index * 26 + ord(letter) - ord('A') + 1
+    return index - 1
+
+
+def parse_cell(text, size=BOARD_SIZE):
+    """Parse "B7" or "AB120" into ``(row, col)``, checking it is on the board."""
+    text = text.strip().upper()
+    letters = len(text) - len(text.lstrip("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    if not letters or not text[letters:].isdigit():
+        raise ValueError(f"Expected a column letter and a row number, like A5, not {text!r}")
+    row, col = int(text[letters:]), column_index(text[:letters])
+    if not (0 <= row < size and 0 <= col < size):
+        raise ValueError(f"{text} is off the board (columns A-{column_label(size - 1)}, rows 0-{size - 1})")
+    return row, col
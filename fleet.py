@@ -0,0 +1,160 @@
+"""Random legal fleet layouts under the no-touch rule.
+
+Every (ship size, orientation) keeps a sorted list of anchors that are
+still legal on the board being filled. Placing a ship removes exactly the
+anchors whose footprint meets the new ship's forbidden zone, so each ship
+is drawn uniformly from its remaining legal positions without ever
+trying an illegal one.
+
+That makes every *step* uniform, not every *layout*: a layout whose early
+ships leave few options for the later ones comes up more often than one
+that leaves many. This is the distribution every random fleet in the
+game, the simulations and the batch engine is drawn from; code that needs
+layouts weighted equally (such as :mod:`posterior`) must not treat these
+draws as uniform.
+
+Those anchor sets grow with the board's area, so boards that use
+:class:`placement.PlacementSets` draw random anchors instead and check
+each against the forbidden zone in O(ship size).
+"""
+import random
+from itertools import filterfalse
+
+from Ship import Orientation
+from config import BOARD_SIZE
+from placement import PlacementSets
+
+# Random anchors tried per ship on a large board before starting over
+SPARSE_TRIES = 10000
+
+
+def _orientations(ship_size):
+    # A one-cell ship looks the same either way round
+    return ("H",) if ship_size == 1 else ("H", "V")
+
+
+def random_layout(board, fleet=None, rng=None, max_restarts=1000):
+    """Return ``[(ship_class, orientation, row, col), ...]`` for ``fleet``.
+
+    The default fleet is the one ``board`` was built with.
+
+    Ships already on ``board`` are respected; the board itself is not
+    modified. Biggest ships go first. If the board fills up before the
+    fleet is complete the layout is started again from the board's state,
+    which for the standard fleet happens in well under 1% of layouts.
+    """
+    ships = _ships(fleet or board.fleet)
+    if isinstance(board.placement, PlacementSets):
+        return _draw_sparse(board, ships, rng or random.Random(), max_restarts)
+    return _draw(board, ships, _candidates(board, ships), rng or random.Random(), max_restarts)
+
+
+def _ships(fleet):
+    ships = [(ship_class, ship_class().size) for ship_class, count in fleet for _ in range(count)]
+    return sorted(ships, key=lambda item: -item[1])
+
+
+def _candidates(board, ships):
+    candidates = {}
+    for _, size in ships:
+        for orientation in _orientations(size):
+            anchors = board.placement.anchors(size, orientation)
+            if board.forbidden:
+                table = board.placement.footprints(size, orientation)
+                anchors = {anchor for anchor in anchors if not table[anchor] & board.forbidden}
+            candidates[(size, orientation)] = sorted(anchors)
+    return candidates
+
+
+def _draw(board, ships, initial, rng, max_restarts):
+    masks = board.placement
+    for _ in range(max_restarts):
+        candidates = {key: list(anchors) for key, anchors in initial.items()}
+        # Forbidden cells not yet filtered out of each list; a list is only
+        # filtered when a ship of its size is about to be drawn
+        pending = {key: set() for key in candidates}
+        layout = []
+        for ship_class, size in ships:
+            orientations = _orientations(size)
+            for orientation in orientations:
+                key = (size, orientation)
+                if pending[key]:
+                    covering = masks.covering(size, orientation)
+                    removed = set().union(*[covering[cell] for cell in pending[key]])
+                    candidates[key] = list(filterfalse(removed.__contains__, candidates[key]))
+                    pending[key].clear()
+            total = sum(len(candidates[(size, o)]) for o in orientations)
+            if not total:
+                break
+            pick = rng.randrange(total)
+            for orientation in orientations:
+                anchors = candidates[(size, orientation)]
+                if pick < len(anchors):
+                    anchor = anchors[pick]
+                    break
+                pick -= len(anchors)
+            row, col = divmod(anchor, board.size)
+            layout.append((ship_class, orientation, row, col))
+            zone = set()
+            for r, c in ship_class().cells(row, col, orientation):
+                zone.update(masks.halo(r, c))
+            # Ships are placed biggest first, so larger footprints are no longer needed
+            for key, cells in pending.items():
+                if key[0] <= size:
+                    cells |= zone
+        else:
+            return layout
+    raise ValueError("Fleet does not fit on this board")
+
+
+def _draw_sparse(board, ships, rng, max_restarts):
+    placement = board.placement
+    size = board.size
+    for _ in range(max_restarts):
+        forbidden = set(board.forbidden)
+        layout = []
+        for ship_class, ship_size in ships:
+            orientations = _orientations(ship_size)
+            for _ in range(SPARSE_TRIES):
+                orientation = rng.choice(orientations)
+                row = rng.randrange(size - (ship_size - 1 if orientation == "V" else 0))
+                col = rng.randrange(size - (ship_size - 1 if orientation == "H" else 0))
+                footprint = placement.footprint(ship_size, orientation, row, col)
+                if not footprint & forbidden:
+                    break
+            else:
+                break
+            layout.append((ship_class, orientation, row, col))
+            forbidden |= placement.zone([divmod(cell, size) for cell in footprint])
+        else:
+            return layout
+    raise ValueError("Fleet does not fit on this board")
+
+
+def place_fleet(board, layout):
+    """Place a layout from :func:`random_layout` on ``board`` and return the ships."""
+    ships = []
+    for ship_class, orientation, row, col in layout:
+        ship = ship_class()
+        board.place_ships(ship, ship.cells(row, col, orientation))
+        ship.orientation = Orientation(orientation)
+        ships.append(ship)
+    return ships
+
+
+def random_fleet(board, fleet=None, rng=None):
+    place_fleet(board, random_layout(board, fleet, rng))
+    return board
+
+
+def random_layouts(count, size=BOARD_SIZE, fleet=None, seed=None, board_class=None):
+    """Generate ``count`` independent layouts for an empty board of ``size``."""
+    if board_class is None:
+        from Board import Board as board_class
+    rng = random.Random(seed)
+    empty = board_class(size, fleet)
+    ships = _ships(empty.fleet)
+    if isinstance(empty.placement, PlacementSets):
+        return [_draw_sparse(empty, ships, rng, 1000) for _ in range(count)]
+    initial = _candidates(empty, ships)
+    return [_draw(empty, ships, initial, rng, 1000) for _ in range(count)]
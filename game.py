@@ -1,37 +1,69 @@
 import os
 from Board import Board
 from Player import Player
-from Ship import Ship
+from config import BOARD_SIZE, describe_fleet, scaled_fleet
+import instrument
+import snapshot
+from movelog import LOG_FILE, MoveLog, MoveLogError
+from render import ConsoleRenderer
 
 class BattleShipGame:
 
-    def __init__(self):
+    def __init__(self, board_class=Board, log_path=LOG_FILE, size=BOARD_SIZE, fleet=None):
+        self.board_class = board_class
+        self.size = size
+        self.fleet = fleet or scaled_fleet(size)
+        self.log_path = log_path
+        self.move_log = None
+        self.recorder = None
+        self.vs_computer = False
         self.player1 = None
         self.player2 = None
         self.current_player = None
         self.opponent = None
         self.game_over = False
         self.winner = None
+        self.save_file = snapshot.SAVE_FILE
+        self.renderer = ConsoleRenderer()
 
     def clean_screen(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        self.renderer.clear()
+
+    def show_boards(self, player):
+        # The player's own fleet next to what they know of the enemy waters
+        self.renderer.show([(f"{player.name}'s fleet", player.board, False),
+                            (f"{player.name}'s shots at {self.opponent.name}", player.opponent_board, True)])
 
     def welcome(self):
         print("=" * 50)
         print("Welcome to BattleShip Game") 
         print("=" * 50)
         print("Rules:")
-        print("1. Each player places 10 ships: 1 Battleship(4), 2 Cruiser(3), 3 Submarine(2), 4 Destroyer(1)")
+        ships = sum(count for _, count in self.fleet)
+        print(f"1. Each player places {ships} ships on a {self.size}x{self.size} board: {describe_fleet(self.fleet)}")
         print("2. Players take turns to attack the opponent's board")
         print("3. If you hit, your opponent skips the move") 
         print("4. First to sink all enemy ships wins")
         print("Good luck!")
         print("=" * 50)
 
+    def choose_opponent(self):
+        while True:
+            choice = input("\nPlay against the computer? (y/n): ").lower().strip()
+            if choice in ['y', 'yes']:
+                return True
+            elif choice in ['n', 'no']:
+                return False
+            else:
+                print("Please enter 'y' for yes or 'n' for no")
+
     def name_player(self):
         print("\nRegister the Players")
         player1_name = input("Enter Player1's name: ").strip()
-        player2_name = input("Enter Player2's name: ").strip()
+        if self.vs_computer:
+            player2_name = "Computer"
+        else:
+            player2_name = input("Enter Player2's name: ").strip()
 
         if not player1_name:
             player1_name = "Player 1"
@@ -41,20 +73,74 @@ class BattleShipGame:
         return player1_name, player2_name
 
     def setup_players(self):
-        Ship.reset_counters()  
-
+        self.vs_computer = self.choose_opponent()
         player1_name, player2_name = self.name_player()
 
-        player1_board = Board()
-        player1_opponent_board = Board()
-        player2_board = Board()
-        player2_opponent_board = Board()
+        player1_board = self.board_class(self.size)
+        player1_opponent_board = self.board_class(self.size)
+        player2_board = self.board_class(self.size)
+        player2_opponent_board = self.board_class(self.size)
 
         
-        self.player1 = Player(player1_name, player1_board, player1_opponent_board)
-        self.player2 = Player(player2_name, player2_board, player2_opponent_board)
+        self.player1 = Player(player1_name, player1_board, player1_opponent_board, self.fleet)
+        if self.vs_computer:
+            # The bot needs NumPy; human-only games never load it
+            from bot import DensityBot
+            self.player2 = DensityBot(player2_name, player2_board, player2_opponent_board, fleet=self.fleet)
+        else:
+            self.player2 = Player(player2_name, player2_board, player2_opponent_board, self.fleet)
+        return True
+
+    def has_saved_game(self):
+        return os.path.exists(self.save_file)
+
+    def ask_resume(self):
+        if not self.has_saved_game():
+            return False
+        while True:
+            choice = input("\nResume the saved game? (y/n): ").lower().strip()
+            if choice in ['y', 'yes']:
+                return True
+            elif choice in ['n', 'no']:
+                return False
+            else:
+                print("Please enter 'y' for yes or 'n' for no")
+
+    def save_game(self):
+        turn = 0 if self.current_player is self.player1 else 1
+        size = snapshot.save(self.save_file, self.player1, self.player2, phase="battle", turn=turn, vs_computer=self.vs_computer)
+        print(f"\nGame saved to {self.save_file} ({size} bytes)")
+
+    def load_game(self):
+        from bot import DensityBot
+        state = snapshot.load(self.save_file, board_class=self.board_class, computer_class=DensityBot)
+        # A save is resumed once; saving again writes a fresh one
+        os.remove(self.save_file)
+        self.player1 = state['player1']
+        self.player2 = state['player2']
+        self.vs_computer = state['vs_computer']
+        self.fleet = self.player1.fleet
+        if state['turn'] == 0:
+            self.current_player, self.opponent = self.player1, self.player2
+        else:
+            self.current_player, self.opponent = self.player2, self.player1
+        print(f"\nResuming {self.player1.name} vs {self.player2.name}, {self.current_player.name} to move")
         return True
 
+    def start_recording(self, resumed=False):
+        # Every shot from here on is appended to the move log (None disables it)
+        if not self.log_path:
+            return
+        if self.move_log is None:
+            try:
+                self.move_log = MoveLog(self.log_path)
+            except (OSError, MoveLogError) as e:
+                # A log that cannot be written must not stop the game itself
+                print(f"Not recording moves: {e}")
+                self.log_path = None
+                return
+        self.recorder = self.move_log.start_game(self.player1, self.player2, vs_computer=self.vs_computer, resumed=resumed)
+
     def ship_placement_phase(self):
         print(f"\n{self.player1.name} place your ships")
         input("Press Enter when ready")
@@ -64,6 +150,11 @@ class BattleShipGame:
         input(f"\n{self.player1.name}'s ships are placed.\nPress Enter to continue")
         self.clean_screen()
 
+        if self.vs_computer:
+            self.player2.place_ships()
+            print(f"\n{self.player2.name} has placed its ships.")
+            return
+
         print(f"\n{self.player2.name} place your ships")
         input("Press Enter when ready")
         self.clean_screen()
@@ -74,25 +165,34 @@ class BattleShipGame:
         
     def battle_phase(self):
         print("Let the Battle begin!")
-        self.current_player = self.player1
-        self.opponent = self.player2
+        if self.current_player is None:
+            self.current_player = self.player1
+            self.opponent = self.player2
 
         while not self.game_over:
+            if not (self.vs_computer and self.current_player is self.player2):
+                self.show_boards(self.current_player)
             print(f"\n{'='*20} {self.current_player.name}'s Turn {'=' * 20}")
             result = self.current_player.make_attack(self.opponent)
 
-            if self.opponent.board.all_ships_sunk():
+            if result.remaining == 0:
                 self.game_over = True
                 self.winner = self.current_player
+                if self.recorder:
+                    self.recorder.end(self.winner)
                 break
                 
-            if result == 'hit':
+            if result.outcome == 'hit':
                 print(f"\n{self.current_player.name} gets another move")
                 input("Press Enter to continue")
             else:
                 self.current_player, self.opponent = self.opponent, self.current_player
-                input(f"\n{self.current_player.name} takes the turn.\nPress Enter when ready.")
+                choice = input(f"\n{self.current_player.name} takes the turn.\nPress Enter when ready (S to save and quit).")
+                if choice.strip().lower() == 's':
+                    self.save_game()
+                    return False
                 self.clean_screen()
+        return True
 
     def display_game_over(self):
         print(f"\nGame Over!!!")
@@ -117,15 +217,23 @@ class BattleShipGame:
         self.opponent = None
         self.game_over = False
         self.winner = None
+        self.vs_computer = False
+        self.recorder = None
         
-    def start_game(self):
-        if not self.setup_players():
-            print("Error setting up players.")
-            return False
+    def start_game(self, resume=False):
         try:
-            self.ship_placement_phase()
-            self.battle_phase()
+            if resume:
+                self.load_game()
+            elif not self.setup_players():
+                print("Error setting up players.")
+                return False
+            else:
+                self.ship_placement_phase()
+            self.start_recording(resumed=resume)
+            if not self.battle_phase():
+                return None
             self.display_game_over()
+            instrument.game_over()
             return True
 
         except KeyboardInterrupt:
@@ -139,7 +247,11 @@ class BattleShipGame:
         self.welcome()
         
         while True:
-            if self.start_game():
+            result = self.start_game(self.ask_resume())
+            if result is None:
+                print("\nSee you next time")
+                break
+            if result:
                 if not self.play_again():
                     print("\nThanks for playing")
                     break
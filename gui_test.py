@@ -1,25 +1,32 @@
 import tkinter as tk
-from tkinter import messagebox
-from PIL import Image, ImageTk
+from tkinter import filedialog, messagebox
+from PIL import ImageTk
 from Board import Board
 from Player import Player
-from Ship import Battleship, Cruiser, Submarine, Destroyer, Ship
+from config import BOARD_SIZE, column_label, scaled_fleet, ship_size
+from fleet import random_fleet
+from sprites import LazyImages, SpriteCache, register_sprites
+import instrument
+import snapshot
+from movelog import LOG_FILE, MoveLog, MoveLogError
 
-CELL_SIZE = 50
-GRID_SIZE = 10  # Explicit 10x10 grid
+GRID_SIZE = BOARD_SIZE
+CELL_SIZE = max(50 * 10 // GRID_SIZE, 12)  # 50px cells on the standard 10x10 grid
 MARGIN = 30
 BG_COLOR = '#B3CDE0'  # Pastel blue to complement ocean theme
 
-SHIP_CLASSES = {
-    'Battleship': (Battleship, 1, 4, 'Battleship.png'),
-    'Cruiser': (Cruiser, 2, 3, 'Cruiser.png'),
-    'Submarine': (Submarine, 3, 2, 'Submarine.png'),
-    'Destroyer': (Destroyer, 4, 1, 'Destroyer.png')
-}
+SHIP_CLASSES = {ship_class.__name__: (ship_class, count, ship_size(ship_class), f'{ship_class.__name__}.png')
+                for ship_class, count in scaled_fleet(GRID_SIZE)}
 
 class BattleshipGUI:
-    def __init__(self, root):
+    def __init__(self, root, board_class=Board, log_path=LOG_FILE):
         self.root = root
+        self.board_class = board_class
+        self.log_path = log_path
+        self.move_log = None
+        self.recorder = None
+        self.replay_log = None
+        self.vs_computer = False
         self.root.title("Battleship 2-Player")
         self.root.configure(bg=BG_COLOR)
         self.images = {}
@@ -33,6 +40,7 @@ class BattleshipGUI:
         self.remaining_ships = None
         self.preview_positions = []
         self.preview_valid = False
+        self.preview_key = None
         self.ship_buttons = {}
         self.game_frame = None
         self.canvas = None
@@ -42,25 +50,14 @@ class BattleshipGUI:
         self.setup_start_screen()
 
     def load_images(self):
-        try:
-            water_img = Image.open("assets/water.png")
-            self.images['water'] = ImageTk.PhotoImage(water_img.resize(
-                (CELL_SIZE * GRID_SIZE, CELL_SIZE * GRID_SIZE)))
-            for name, (_, _, size, image_file) in SHIP_CLASSES.items():
-                img = Image.open(f"assets/{image_file}")
-                if size > 1:
-                    width = CELL_SIZE * size
-                    height = CELL_SIZE
-                    img_h = img.resize((width, height), Image.LANCZOS)
-                    self.images[name] = ImageTk.PhotoImage(img_h)
-                    img_v = img_h.rotate(90, expand=True)
-                    self.images[f"{name}_V"] = ImageTk.PhotoImage(img_v)
-                else:
-                    img = img.resize((CELL_SIZE, CELL_SIZE), Image.LANCZOS)
-                    self.images[name] = ImageTk.PhotoImage(img)
-        except Exception as e:
-            print(f"Error loading images: {e}")
-            messagebox.showwarning("Image Warning", "Could not load some game images.")
+        # Sprites come from the on-disk cache and only become Tk images
+        # the first time they are drawn
+        self.images = LazyImages(SpriteCache(), ImageTk.PhotoImage, on_error=self.image_load_failed)
+        ships = [(name, size, image_file) for name, (_, _, size, image_file) in SHIP_CLASSES.items()]
+        register_sprites(self.images, CELL_SIZE, GRID_SIZE, ships)
+
+    def image_load_failed(self, error):
+        messagebox.showwarning("Image Warning", "Could not load some game images.")
 
     def setup_start_screen(self):
         self.start_frame = tk.Frame(self.root, bg=BG_COLOR)
@@ -73,13 +70,23 @@ class BattleshipGUI:
         self.p2_entry = tk.Entry(self.start_frame, font=("Arial", 12))
         self.p2_entry.insert(0, "Player 2")
         self.p2_entry.pack(pady=5)
+        self.vs_computer_var = tk.BooleanVar(value=self.vs_computer)
+        tk.Checkbutton(self.start_frame, text="Player 2 is the computer", variable=self.vs_computer_var, font=("Arial", 12), fg='#1E3A5F', bg=BG_COLOR).pack(pady=5)
         tk.Button(self.start_frame, text="Start Game", font=("Arial", 12), bg='#22C55E', fg='white', command=self.start_game).pack(pady=20)
+        tk.Button(self.start_frame, text="📂 Load Game", font=("Arial", 12), bg='#3B82F6', fg='white', command=self.load_game).pack(pady=5)
+        tk.Button(self.start_frame, text="🎞 Replay Games", font=("Arial", 12), bg='#6366F1', fg='white', command=self.open_replay).pack(pady=5)
 
     def start_game(self):
         p1_name = self.p1_entry.get().strip() or "Player 1"
         p2_name = self.p2_entry.get().strip() or "Player 2"
-        self.player1 = Player(p1_name, Board(), Board())
-        self.player2 = Player(p2_name, Board(), Board())
+        self.vs_computer = self.vs_computer_var.get()
+        self.player1 = Player(p1_name, self.board_class(GRID_SIZE), self.board_class(GRID_SIZE))
+        if self.vs_computer:
+            # The bot needs NumPy; human-only games never load it
+            from bot import DensityBot
+            self.player2 = DensityBot(p2_name, self.board_class(GRID_SIZE), self.board_class(GRID_SIZE))
+        else:
+            self.player2 = Player(p2_name, self.board_class(GRID_SIZE), self.board_class(GRID_SIZE))
         self.current_player = self.player1
         self.opponent = self.player2
         self.remaining_ships = self.init_remaining_ships()
@@ -109,11 +116,60 @@ class BattleshipGUI:
             btn = tk.Button(self.ship_frame, text=f"{name}\n(Size: {size})", font=("Arial", 10), width=10, height=2, command=lambda n=name: self.select_ship(n))
             btn.pack(side="left", padx=5)
             self.ship_buttons[name] = btn
+        tk.Button(self.ship_frame, text="🎲 Auto-place", font=("Arial", 11), bg='#8B5CF6', fg='white', command=self.auto_place_ships).pack(side="left", padx=5)
         tk.Button(self.ship_frame, text="🔄 Rotate (R)", font=("Arial", 11), bg='#3B82F6', fg='white', command=self.toggle_orientation).pack(side="left", padx=5)
         tk.Button(self.ship_frame, text="🏠 Main Menu", font=("Arial", 11), bg='#6B7280', fg='white', command=self.show_main_menu).pack(side="left", padx=5)
+        tk.Button(self.game_frame, text="💾 Save Game", font=("Arial", 11), bg='#0EA5E9', fg='white', command=self.save_game).pack(pady=5)
         self.update_ship_buttons()
+        self.build_scene()
         self.draw_boards()
 
+    def save_game(self):
+        path = filedialog.asksaveasfilename(defaultextension=".sav", initialfile=snapshot.SAVE_FILE, filetypes=[("Battleship saves", "*.sav")])
+        if not path:
+            return
+        turn = 0 if self.current_player is self.player1 else 1
+        winner = turn if self.phase == "game_over" else None
+        snapshot.save(path, self.player1, self.player2, phase=self.phase, turn=turn, winner=winner, vs_computer=self.vs_computer)
+        self.status_label.config(text=f"💾 Game saved to {path}")
+
+    def load_game(self):
+        path = filedialog.askopenfilename(filetypes=[("Battleship saves", "*.sav")])
+        if not path:
+            return
+        from bot import DensityBot
+        try:
+            state = snapshot.load(path, board_class=self.board_class, computer_class=DensityBot)
+        except (OSError, snapshot.SnapshotError) as e:
+            messagebox.showerror("Load Failed", f"Could not load {path}:\n{e}")
+            return
+        self.player1 = state['player1']
+        self.player2 = state['player2']
+        self.vs_computer = state['vs_computer']
+        self.phase = state['phase']
+        turn = state['turn'] if state['winner'] is None else state['winner']
+        if turn == 0:
+            self.current_player, self.opponent = self.player1, self.player2
+        else:
+            self.current_player, self.opponent = self.player2, self.player1
+        # Ships still waiting to be placed by whoever is placing now
+        self.remaining_ships = {name: count for name, _, count, _ in self.current_player.ships_to_place.values()}
+        self.selected_ship = None
+        self.orientation = 'H'
+        self.preview_positions = []
+        self.preview_valid = False
+        self.preview_key = None
+        self.clear_screen()
+        self.game_frame = None
+        if self.phase == "battle":
+            self.start_recording(resumed=True)
+            self.show_turn_transition()
+        elif self.phase == "game_over":
+            self.setup_game_gui()
+            self.show_game_over()
+        else:
+            self.setup_game_gui()
+
     def show_turn_transition(self):
         # Hide game UI
         if self.game_frame:
@@ -138,57 +194,35 @@ class BattleshipGUI:
             col = (x - MARGIN) // CELL_SIZE
             row = (y - MARGIN) // CELL_SIZE
             if 0 <= row < GRID_SIZE and 0 <= col < GRID_SIZE:
-                self.update_ship_preview(row, col)
+                # Motion within the same cell with the same ship changes nothing
+                key = (row, col, self.selected_ship, self.orientation)
+                if key != self.preview_key:
+                    self.update_ship_preview(row, col)
         else:
             self.clear_ship_preview()
 
     def update_ship_preview(self, row, col):
         _, _, size, _ = SHIP_CLASSES[self.selected_ship]
         positions = []
-        valid = True
-        if self.orientation == 'H':
-            for i in range(size):
-                new_col = col + i
-                if new_col >= GRID_SIZE:
-                    valid = False
-                    break
-                positions.append((row, new_col))
-        else:
-            for i in range(size):
-                new_row = row + i
-                if new_row >= GRID_SIZE:
-                    valid = False
-                    break
-                positions.append((new_row, col))
-        if valid and hasattr(self.current_player.board, 'grid'):
-            for pos_row, pos_col in positions:
-                if self.current_player.board.grid[pos_row][pos_col] == 'S':
-                    valid = False
-                    break
-            if valid:
-                for pos_row, pos_col in positions:
-                    for dr in [-1, 0, 1]:
-                        for dc in [-1, 0, 1]:
-                            if dr == 0 and dc == 0:
-                                continue
-                            adj_row, adj_col = pos_row + dr, pos_col + dc
-                            if 0 <= adj_row < GRID_SIZE and 0 <= adj_col < GRID_SIZE:
-                                if self.current_player.board.grid[adj_row][adj_col] == 'S':
-                                    valid = False
-                                    break
-                        if not valid:
-                            break
-                    if not valid:
-                        break
+        for i in range(size):
+            new_row = row + (i if self.orientation == 'V' else 0)
+            new_col = col + (i if self.orientation == 'H' else 0)
+            if new_row >= GRID_SIZE or new_col >= GRID_SIZE:
+                break
+            positions.append((new_row, new_col))
+        board = self.current_player.board
+        valid = board.validity_map(size, self.orientation)[row * board.size + col]
         self.preview_positions = positions
         self.preview_valid = valid
-        self.draw_boards()
+        self.preview_key = (row, col, self.selected_ship, self.orientation)
+        self.draw_ship_preview()
 
     def clear_ship_preview(self):
+        self.preview_key = None
         if self.preview_positions:
             self.preview_positions = []
             self.preview_valid = False
-            self.draw_boards()
+            self.draw_ship_preview()
 
     def update_ship_buttons(self):
         for name, btn in self.ship_buttons.items():
@@ -198,91 +232,122 @@ class BattleshipGUI:
             else:
                 btn.config(state=tk.DISABLED, bg='#6B7280', text=f"{name}\n(Placed)")
 
-    def draw_boards(self):
+    def build_scene(self):
+        # Titles, water, labels and grid lines are created once per canvas;
+        # ships, markers and the preview are then updated item by item
         self.canvas.delete("all")
+        self.ship_items = {}
+        self.marker_items = {}
         px1 = MARGIN  # Left board: player's fleet
         px2 = MARGIN + GRID_SIZE * CELL_SIZE + 60  # Right board: opponent's waters/attack grid
-        left_title = f"{self.current_player.name}'s Fleet" if self.phase.startswith("placement") else f"{self.current_player.name}'s Fleet"
-        right_title = "Opponent's Waters" if self.phase.startswith("placement") else f"{self.opponent.name}'s Attack Grid"
-        self.canvas.create_text(px1 + GRID_SIZE * CELL_SIZE // 2, 10, text=left_title, font=("Arial", 12, "bold"), fill='#1E3A5F')
-        self.canvas.create_text(px2 + GRID_SIZE * CELL_SIZE // 2, 10, text=right_title, font=("Arial", 12, "bold"), fill='#1E3A5F')
+        self.left_title = self.canvas.create_text(px1 + GRID_SIZE * CELL_SIZE // 2, 10, font=("Arial", 12, "bold"), fill='#1E3A5F')
+        self.right_title = self.canvas.create_text(px2 + GRID_SIZE * CELL_SIZE // 2, 10, font=("Arial", 12, "bold"), fill='#1E3A5F')
         if 'water' in self.images:
-            self.canvas.create_image(px1, MARGIN, image=self.images['water'], anchor="nw")
-            self.canvas.create_image(px2, MARGIN, image=self.images['water'], anchor="nw")
-        for i in range(GRID_SIZE):  # 10x10 grid
-            letter = chr(ord('A') + i)
+            self.canvas.create_image(px1, MARGIN, image=self.images['water'], anchor="nw", tags=("grid",))
+            self.canvas.create_image(px2, MARGIN, image=self.images['water'], anchor="nw", tags=("grid",))
+        for i in range(GRID_SIZE):
+            letter = column_label(i)
             number = str(i)
-            self.canvas.create_text(px1 + i * CELL_SIZE + CELL_SIZE // 2, MARGIN - 10, text=letter, font=("Arial", 10, "bold"), fill='#1E3A5F')
-            self.canvas.create_text(px2 + i * CELL_SIZE + CELL_SIZE // 2, MARGIN - 10, text=letter, font=("Arial", 10, "bold"), fill='#1E3A5F')
-            self.canvas.create_text(MARGIN - 15, MARGIN + i * CELL_SIZE + CELL_SIZE // 2, text=number, font=("Arial", 10, "bold"), fill='#1E3A5F')
-            self.canvas.create_text(px2 - 15, MARGIN + i * CELL_SIZE + CELL_SIZE // 2, text=number, font=("Arial", 10, "bold"), fill='#1E3A5F')
-            for j in range(GRID_SIZE):  # 10x10 grid
+            self.canvas.create_text(px1 + i * CELL_SIZE + CELL_SIZE // 2, MARGIN - 10, text=letter, font=("Arial", 10, "bold"), fill='#1E3A5F', tags=("grid",))
+            self.canvas.create_text(px2 + i * CELL_SIZE + CELL_SIZE // 2, MARGIN - 10, text=letter, font=("Arial", 10, "bold"), fill='#1E3A5F', tags=("grid",))
+            self.canvas.create_text(MARGIN - 15, MARGIN + i * CELL_SIZE + CELL_SIZE // 2, text=number, font=("Arial", 10, "bold"), fill='#1E3A5F', tags=("grid",))
+            self.canvas.create_text(px2 - 15, MARGIN + i * CELL_SIZE + CELL_SIZE // 2, text=number, font=("Arial", 10, "bold"), fill='#1E3A5F', tags=("grid",))
+            for j in range(GRID_SIZE):
                 x1, y1 = px1 + j * CELL_SIZE, MARGIN + i * CELL_SIZE
-                self.canvas.create_rectangle(x1, y1, x1 + CELL_SIZE, y1 + CELL_SIZE, outline="#1E3A5F", width=1)
+                self.canvas.create_rectangle(x1, y1, x1 + CELL_SIZE, y1 + CELL_SIZE, outline="#1E3A5F", width=1, tags=("grid",))
                 x2, y2 = px2 + j * CELL_SIZE, MARGIN + i * CELL_SIZE
-                self.canvas.create_rectangle(x2, y2, x2 + CELL_SIZE, y2 + CELL_SIZE, outline="#1E3A5F", width=1)
+                self.canvas.create_rectangle(x2, y2, x2 + CELL_SIZE, y2 + CELL_SIZE, outline="#1E3A5F", width=1, tags=("grid",))
+        longest = max(size for _, _, size, _ in SHIP_CLASSES.values())
+        self.preview_items = [self.canvas.create_rectangle(0, 0, 0, 0, outline="black", width=2, stipple="gray50", state="hidden", tags=("preview",))
+                              for _ in range(longest)]
+
+    def draw_boards(self):
+        left_title = f"{self.current_player.name}'s Fleet"
+        right_title = "Opponent's Waters" if self.phase.startswith("placement") else f"{self.opponent.name}'s Attack Grid"
+        self.canvas.itemconfigure(self.left_title, text=left_title)
+        self.canvas.itemconfigure(self.right_title, text=right_title)
         self.draw_ships()
-        if self.phase.startswith("placement") and self.preview_positions:
-            self.draw_ship_preview()
+        self.draw_ship_preview()
         self.draw_attacks()
 
     def draw_ship_preview(self):
         px = MARGIN
         color = "#90EE90" if self.preview_valid else "#FF6B6B"
-        for row, col in self.preview_positions:
-            x = px + col * CELL_SIZE + 2
-            y = MARGIN + row * CELL_SIZE + 2
-            self.canvas.create_rectangle(x, y, x + CELL_SIZE - 4, y + CELL_SIZE - 4, fill=color, outline="black", width=2, stipple="gray50")
+        positions = self.preview_positions if self.phase.startswith("placement") else []
+        for i, item in enumerate(self.preview_items):
+            if i < len(positions):
+                row, col = positions[i]
+                x = px + col * CELL_SIZE + 2
+                y = MARGIN + row * CELL_SIZE + 2
+                self.canvas.coords(item, x, y, x + CELL_SIZE - 4, y + CELL_SIZE - 4)
+                self.canvas.itemconfigure(item, fill=color, state="normal")
+            else:
+                self.canvas.itemconfigure(item, state="hidden")
 
     def draw_ships(self):
-        board = self.current_player.board if self.phase.startswith("placement") else self.current_player.board
+        # Only ships that are new to the canvas are created; ships of the
+        # other player (after a perspective switch) are removed
+        board = self.current_player.board
+        placed = [ship for ship in board.ships if ship.is_placed]
+        for ship in list(self.ship_items):
+            if ship not in placed:
+                self.canvas.delete(*self.ship_items.pop(ship))
+        created = False
+        for ship in placed:
+            if ship not in self.ship_items:
+                self.ship_items[ship] = self.create_ship_items(ship)
+                created = True
+        if created:
+            self.canvas.tag_raise("preview")
+            self.canvas.tag_raise("marker")
+
+    def create_ship_items(self, ship):
         px = MARGIN
-        if hasattr(board, 'ships'):
-            for ship in board.ships:
-                if ship.is_placed:
-                    row, col = ship.position[0]
-                    x = px + col * CELL_SIZE
-                    y = MARGIN + row * CELL_SIZE
-                    name = ship.__class__.__name__
-                    orientation_suffix = "" if ship.orientation.value == "H" else "_V"
-                    img_key = name + orientation_suffix
-                    if img_key in self.images:
-                        self.canvas.create_image(x, y, image=self.images[img_key], anchor="nw")
-                    else:
-                        for pos_row, pos_col in ship.position:
-                            x = px + pos_col * CELL_SIZE + 2
-                            y = MARGIN + pos_row * CELL_SIZE + 2
-                            self.canvas.create_rectangle(x, y, x + CELL_SIZE - 4, y + CELL_SIZE - 4, fill="#8B4513", outline="black", width=2)
+        row, col = ship.position[0]
+        x = px + col * CELL_SIZE
+        y = MARGIN + row * CELL_SIZE
+        name = ship.__class__.__name__
+        orientation_suffix = "" if ship.orientation.value == "H" else "_V"
+        img_key = name + orientation_suffix
+        if img_key in self.images:
+            return [self.canvas.create_image(x, y, image=self.images[img_key], anchor="nw", tags=("ship",))]
+        items = []
+        for pos_row, pos_col in ship.position:
+            x = px + pos_col * CELL_SIZE + 2
+            y = MARGIN + pos_row * CELL_SIZE + 2
+            items.append(self.canvas.create_rectangle(x, y, x + CELL_SIZE - 4, y + CELL_SIZE - 4, fill="#8B4513", outline="black", width=2, tags=("ship",)))
+        return items
 
     def draw_attacks(self):
-        if self.phase != "battle":
+        if self.phase not in ("battle", "replay"):
             return
-        px1 = MARGIN  # Current player's board
-        px2 = MARGIN + GRID_SIZE * CELL_SIZE + 60  # Opponent's attack grid
-        # Draw attacks on opponent's attack grid (right)
-        board = self.current_player.opponent_board
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                mark = board.grid[r][c]
-                x = px2 + c * CELL_SIZE + CELL_SIZE // 2
-                y = MARGIN + r * CELL_SIZE + CELL_SIZE // 2
-                if mark == "X":
-                    self.canvas.create_oval(x - 15, y - 15, x + 15, y + 15, fill="red", outline="darkred", width=3)
-                    self.canvas.create_text(x, y, text="💥", font=("Arial", 16))
-                elif mark == "O":
-                    self.canvas.create_oval(x - 10, y - 10, x + 10, y + 10, fill="white", outline="blue", width=2)
-        # Draw hits on current player's board (left)
-        board = self.current_player.board
-        for r in range(GRID_SIZE):
-            for c in range(GRID_SIZE):
-                mark = board.grid[r][c]
-                x = px1 + c * CELL_SIZE + CELL_SIZE // 2
-                y = MARGIN + r * CELL_SIZE + CELL_SIZE // 2
-                if mark == "X":
-                    self.canvas.create_oval(x - 15, y - 15, x + 15, y + 15, fill="red", outline="darkred", width=3)
-                    self.canvas.create_text(x, y, text="💥", font=("Arial", 16))
-                elif mark == "O":
-                    self.canvas.create_oval(x - 10, y - 10, x + 10, y + 10, fill="white", outline="blue", width=2)
+        for side, board in (("left", self.current_player.board), ("right", self.current_player.opponent_board)):
+            for r in range(GRID_SIZE):
+                for c in range(GRID_SIZE):
+                    self.draw_marker(side, r, c, board.cell(r, c))
+
+    def draw_marker(self, side, row, col, mark):
+        # Hits and misses on the current player's board (left) and attack grid (right)
+        if mark not in ("X", "O"):
+            mark = None
+        key = (side, row, col)
+        current = self.marker_items.get(key)
+        if current and current[0] == mark:
+            return
+        if current:
+            self.canvas.delete(*current[1])
+            del self.marker_items[key]
+        if mark is None:
+            return
+        px = MARGIN if side == "left" else MARGIN + GRID_SIZE * CELL_SIZE + 60
+        x = px + col * CELL_SIZE + CELL_SIZE // 2
+        y = MARGIN + row * CELL_SIZE + CELL_SIZE // 2
+        if mark == "X":
+            items = [self.canvas.create_oval(x - 15, y - 15, x + 15, y + 15, fill="red", outline="darkred", width=3, tags=("marker",)),
+                     self.canvas.create_text(x, y, text="💥", font=("Arial", 16), tags=("marker",))]
+        else:
+            items = [self.canvas.create_oval(x - 10, y - 10, x + 10, y + 10, fill="white", outline="blue", width=2, tags=("marker",))]
+        self.marker_items[key] = (mark, items)
 
     def select_ship(self, ship_name):
         if self.remaining_ships.get(ship_name, 0) > 0:
@@ -327,79 +392,195 @@ class BattleshipGUI:
             placed = ship.place_ship(row, col, self.orientation, self.current_player.board)
             if placed:
                 self.remaining_ships[self.selected_ship] -= 1
-                if not hasattr(self.current_player.board, "ships"):
-                    self.current_player.board.ships = []
-                self.current_player.board.ships.append(ship)
                 self.selected_ship = None
                 self.clear_ship_preview()
                 self.update_ship_buttons()
                 if sum(self.remaining_ships.values()) == 0:
-                    if self.phase == "placement_p1":
-                        messagebox.showinfo("Player Switch", f"{self.player1.name}'s ships placed!\n\n{self.player2.name}, get ready to place your ships!")
-                        Ship.reset_counters()
-                        self.phase = "placement_p2"
-                        self.current_player = self.player2
-                        self.opponent = self.player1
-                        self.remaining_ships = self.init_remaining_ships()
-                        self.selected_ship = None
-                        self.orientation = 'H'
-                        self.clear_ship_preview()
-                        self.update_ship_buttons()
-                        self.status_label.config(text=f"{self.current_player.name}: Place your ships (click to place, press 'R' to rotate, move mouse to preview)")
-                    else:
-                        messagebox.showinfo("Battle Begins!", f"All ships placed!\n\n{self.player1.name} attacks first!")
-                        self.phase = "battle"
-                        self.current_player = self.player1
-                        self.opponent = self.player2
-                        self.ship_frame.destroy()
-                        self.show_turn_transition()
-                    self.draw_boards()
+                    self.finish_placement()
                 else:
                     self.status_label.config(text=f"{self.current_player.name}: Select next ship to place (click to place, press 'R' to rotate, move mouse to preview)")
                     self.draw_boards()
         except ValueError as e:
             messagebox.showwarning("Invalid Placement", str(e))
 
+    def auto_place_ships(self):
+        if not self.phase.startswith("placement"):
+            return
+        remaining = [(SHIP_CLASSES[name][0], count) for name, count in self.remaining_ships.items() if count > 0]
+        try:
+            random_fleet(self.current_player.board, remaining)
+        except ValueError as e:
+            messagebox.showwarning("Invalid Placement", str(e))
+            return
+        self.remaining_ships = {name: 0 for name in self.remaining_ships}
+        self.selected_ship = None
+        self.clear_ship_preview()
+        self.update_ship_buttons()
+        self.finish_placement()
+
+    def finish_placement(self):
+        if self.phase == "placement_p1" and not self.vs_computer:
+            messagebox.showinfo("Player Switch", f"{self.player1.name}'s ships placed!\n\n{self.player2.name}, get ready to place your ships!")
+            self.phase = "placement_p2"
+            self.current_player = self.player2
+            self.opponent = self.player1
+            self.remaining_ships = self.init_remaining_ships()
+            self.selected_ship = None
+            self.orientation = 'H'
+            self.clear_ship_preview()
+            self.update_ship_buttons()
+            self.status_label.config(text=f"{self.current_player.name}: Place your ships (click to place, press 'R' to rotate, move mouse to preview)")
+            self.draw_boards()
+        else:
+            if self.vs_computer:
+                self.player2.place_ships()
+            messagebox.showinfo("Battle Begins!", f"All ships placed!\n\n{self.player1.name} attacks first!")
+            self.phase = "battle"
+            self.current_player = self.player1
+            self.opponent = self.player2
+            self.start_recording()
+            self.ship_frame.destroy()
+            self.show_turn_transition()
+
     def attack_cell(self, row, col):
-        result = self.opponent.board.receive_attack(row, col)
-        if result == "repeat":
+        result = self.current_player.fire(self.opponent, row, col)
+        if result.outcome == "repeat":
             messagebox.showinfo("Already Attacked", "You already attacked this position!")
             return
-        if result == "hit":
-            self.current_player.opponent_board.grid[row][col] = "X"
-            hit_ship = None
-            for ship in self.opponent.board.ships:
-                for pos_row, pos_col in ship.position:
-                    if pos_row == row and pos_col == col:
-                        ship.hit()
-                        hit_ship = ship
-                        break
-                if hit_ship:
-                    break
-            if hit_ship and hit_ship.is_sunk():
-                messagebox.showinfo("Ship Sunk!", f"💥 {self.current_player.name} sunk {self.opponent.name}'s {hit_ship.__class__.__name__}!")
+        if result.outcome == "hit":
+            if result.sunk:
+                messagebox.showinfo("Ship Sunk!", f"💥 {self.current_player.name} sunk {self.opponent.name}'s {result.ship.__class__.__name__}!")
             else:
                 messagebox.showinfo("Hit!", f"💥 {self.current_player.name} scored a hit!")
             self.status_label.config(text=f"🎯 {self.current_player.name} hit! Attack again!")
         else:
-            self.current_player.opponent_board.grid[row][col] = "O"
             messagebox.showinfo("Miss!", f"💧 {self.current_player.name} missed!")
             self.current_player, self.opponent = self.opponent, self.current_player
-            self.show_turn_transition()
+            if self.vs_computer and self.current_player is self.player2:
+                self.computer_turn()
+            else:
+                self.show_turn_transition()
             return
-        self.draw_boards()
-        if self.opponent.board.all_ships_sunk():
+        self.draw_marker("right", row, col, "X")
+        if result.remaining == 0:
             self.phase = "game_over"
             self.canvas.unbind("<Button-1>")
             self.canvas.unbind("<Motion>")
+            self.end_recording()
             self.show_game_over()
 
+    def computer_turn(self):
+        # The board keeps showing the human's view while the computer fires
+        bot, human = self.current_player, self.opponent
+        while True:
+            row, col = bot.choose_target()
+            result = bot.fire(human, row, col)
+            target = f"{column_label(col)}{row}"
+            if result.remaining == 0:
+                self.phase = "game_over"
+                self.end_recording()
+                self.show_game_over()
+                return
+            if result.outcome != "hit":
+                messagebox.showinfo("Miss!", f"💧 {bot.name} fired at {target} and missed!")
+                break
+            if result.sunk:
+                messagebox.showinfo("Ship Sunk!", f"💥 {bot.name} fired at {target} and sunk your {result.ship.__class__.__name__}!")
+            else:
+                messagebox.showinfo("Hit!", f"💥 {bot.name} fired at {target} and scored a hit!")
+        self.current_player, self.opponent = human, bot
+        self.status_label.config(text=f"⚔️ {self.current_player.name}'s turn to attack! Click opponent's grid.")
+        self.draw_boards()
+
+    def start_recording(self, resumed=False):
+        # Shots are appended to the move log until the game ends (log_path=None disables it)
+        if not self.log_path:
+            return
+        if self.move_log is None:
+            try:
+                self.move_log = MoveLog(self.log_path)
+            except (OSError, MoveLogError) as e:
+                # A log that cannot be written must not stop the game itself
+                print(f"Not recording moves: {e}")
+                self.log_path = None
+                return
+        self.recorder = self.move_log.start_game(self.player1, self.player2, vs_computer=self.vs_computer, resumed=resumed)
+
+    def end_recording(self):
+        if self.recorder:
+            self.recorder.end(self.current_player)
+            self.recorder = None
+
+    def open_replay(self):
+        path = filedialog.askopenfilename(filetypes=[("Battleship move logs", "*.log")])
+        if not path:
+            return
+        from movelog import ReplayLog
+        try:
+            replay_log = ReplayLog(path)
+        except (OSError, MoveLogError) as e:
+            messagebox.showerror("Replay Failed", f"Could not open {path}:\n{e}")
+            return
+        self.replay_games = replay_log.games()
+        if not self.replay_games:
+            replay_log.close()
+            messagebox.showinfo("Replay", "The move log has no games yet.")
+            return
+        self.replay_log = replay_log
+        self.clear_screen()
+        self.game_frame = tk.Frame(self.root, bg=BG_COLOR)
+        self.game_frame.pack(fill=tk.BOTH, expand=True)
+        self.status_label = tk.Label(self.game_frame, font=("Arial", 14), fg='#1E3A5F', bg=BG_COLOR)
+        self.status_label.pack(pady=10)
+        total_width = MARGIN + 2 * (CELL_SIZE * GRID_SIZE) + 60
+        total_height = MARGIN + CELL_SIZE * GRID_SIZE + 100
+        self.canvas = tk.Canvas(self.game_frame, width=total_width, height=total_height, bg=BG_COLOR)
+        self.canvas.pack(pady=10)
+        self.root.bind("<Key>", self.handle_replay_key)
+        nav_frame = tk.Frame(self.game_frame, bg=BG_COLOR)
+        nav_frame.pack(pady=10)
+        for text, command in (("⏮ Game", lambda: self.step_replay_game(-1)), ("◀ Move", lambda: self.show_replay_move(self.replay_move - 1)),
+                              ("Move ▶", lambda: self.show_replay_move(self.replay_move + 1)), ("Game ⏭", lambda: self.step_replay_game(1))):
+            tk.Button(nav_frame, text=text, font=("Arial", 11), width=8, command=command).pack(side="left", padx=5)
+        tk.Button(nav_frame, text="🏠 Main Menu", font=("Arial", 11), bg='#6B7280', fg='white', command=self.show_main_menu).pack(side="left", padx=5)
+        self.phase = "replay"
+        self.build_scene()
+        self.replay_index = len(self.replay_games) - 1
+        self.show_replay_move(None)
+
+    def step_replay_game(self, step):
+        self.replay_index = (self.replay_index + step) % len(self.replay_games)
+        self.show_replay_move(None)
+
+    def show_replay_move(self, move):
+        # Rebuilds the game after ``move`` shots (None: the whole game) and shows Player 1's side
+        game = self.replay_games[self.replay_index]
+        state = self.replay_log.replay(game, move, board_class=self.board_class)
+        self.replay_move = state['shots']
+        self.player1, self.player2 = state['player1'], state['player2']
+        self.current_player, self.opponent = self.player1, self.player2
+        self.draw_boards()
+        status = f"Replay of game {self.replay_index + 1} of {len(self.replay_games)}: shot {state['shots']} of {state['total']}"
+        if state['winner'] is not None:
+            status += f" - {(self.player1, self.player2)[state['winner']].name} won"
+        self.status_label.config(text=status)
+
+    def handle_replay_key(self, event):
+        if event.keysym == "Right":
+            self.show_replay_move(self.replay_move + 1)
+        elif event.keysym == "Left":
+            self.show_replay_move(self.replay_move - 1)
+
     def show_main_menu(self):
+        if self.replay_log:
+            self.replay_log.close()
+            self.replay_log = None
         self.clear_screen()
         self.phase = "start"
         self.setup_start_screen()
 
     def show_game_over(self):
+        instrument.game_over()
         self.canvas.delete("all")
         self.game_frame.destroy()
         self.end_frame = tk.Frame(self.root, bg=BG_COLOR)
@@ -410,7 +591,6 @@ class BattleshipGUI:
 
     def restart_game(self):
         self.end_frame.destroy()
-        Ship.reset_counters()
         self.player1.restart()
         self.player2.restart()
         self.current_player = self.player1
@@ -0,0 +1,283 @@
+"""Opt-in instrumentation for the game's hot paths.
+
+Nothing is wrapped until :meth:`Instrumentation.enable` is called, so a
+normal game runs the original methods untouched. Once enabled, every
+target method is replaced on its class by a wrapper that records the call
+count, cumulative time, latency percentiles and, with ``allocations``,
+the net number of memory blocks each call left allocated;
+:meth:`Instrumentation.disable` puts the originals back.
+
+Reports come out as text and JSON at the end of every game (the console
+game and the GUI call :func:`game_over`) and on SIGUSR1. ``capture`` runs
+one headless match under cProfile and tracemalloc instead.
+
+    python instrument.py console --json profile.json
+    python instrument.py gui --allocations
+    python instrument.py capture --seed 7 --out match.prof
+"""
+import functools
+import json
+import random
+import signal
+import sys
+import time
+from array import array
+
+# module:Class.method; targets in modules that have not been imported yet are
+# skipped, so instrumenting the console game does not pull in Tk
+TARGETS = (
+    "Ship:Ship.place_ship",
+    "Board:Board.receive_attack",
+    "Board:Board.all_ships_sunk",
+    "BitBoard:BitBoard.receive_attack",
+    "BitBoard:BitBoard.all_ships_sunk",
+    "SparseBoard:SparseBoard.receive_attack",
+    "Player:Player.fire",
+    "game:BattleShipGame.ship_placement_phase",
+    "game:BattleShipGame.battle_phase",
+    "gui_test:BattleshipGUI.load_images",
+    "gui_test:BattleshipGUI.draw_boards",
+)
+MAX_SAMPLES = 100000
+PERCENTILES = (50, 95, 99)
+
+_active = None
+
+
+class CallStats:
+    """Counts and timings for one target; latencies are kept as a reservoir sample."""
+
+    __slots__ = ("count", "total", "blocks", "samples", "_rng")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.blocks = 0
+        self.samples = array("q")
+        self._rng = random.Random(0)
+
+    def add(self, elapsed, blocks=0):
+        self.count += 1
+        self.total += elapsed
+        self.blocks += blocks
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(elapsed)
+        else:
+            index = self._rng.randrange(self.count)
+            if index < MAX_SAMPLES:
+                self.samples[index] = elapsed
+
+    def summary(self):
+        samples = sorted(self.samples)
+        row = {'calls': self.count, 'total': self.total / 1e9, 'mean': self.total / self.count / 1e9 if self.count else 0.0}
+        for percentile in PERCENTILES:
+            index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+            row[f'p{percentile}'] = samples[index] / 1e9 if samples else 0.0
+        row['max'] = samples[-1] / 1e9 if samples else 0.0
+        row['blocks'] = self.blocks
+        return row
+
+
+class Instrumentation:
+    def __init__(self, targets=TARGETS, allocations=False, json_path=None, stream=None):
+        self.targets = targets
+        self.allocations = allocations
+        self.json_path = json_path
+        self.stream = stream or sys.stderr
+        self.stats = {}
+        self.skipped = {}
+        self._originals = []
+        self.started = None
+
+    def enable(self):
+        global _active
+        if self._originals:
+            return self
+        for target in self.targets:
+            module_name, _, attribute = target.partition(":")
+            class_name, _, method_name = attribute.partition(".")
+            module = sys.modules.get(module_name)
+            if module is None:
+                self.skipped[target] = f"{module_name} is not imported"
+                continue
+            try:
+                cls = getattr(module, class_name)
+                original = cls.__dict__[method_name]
+            except (AttributeError, KeyError) as e:
+                self.skipped[target] = f"{type(e).__name__}: {e}"
+                continue
+            stats = self.stats.setdefault(attribute, CallStats())
+            setattr(cls, method_name, self._wrap(original, stats))
+            self._originals.append((cls, method_name, original))
+        self.started = time.perf_counter()
+        _active = self
+        return self
+
+    def disable(self):
+        global _active
+        for cls, method_name, original in reversed(self._originals):
+            setattr(cls, method_name, original)
+        self._originals.clear()
+        if _active is self:
+            _active = None
+
+    def _wrap(self, func, stats):
+        clock = time.perf_counter_ns
+        if self.allocations:
+            blocks = sys.getallocatedblocks
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                before = blocks()
+                start = clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    elapsed = clock() - start
+                    stats.add(elapsed, blocks() - before)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = clock()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    stats.add(clock() - start)
+        return wrapper
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started if self.started else 0.0
+        targets = {name: stats.summary() for name, stats in self.stats.items() if stats.count}
+        return {'elapsed': elapsed, 'allocations': self.allocations, 'targets': targets, 'skipped': self.skipped}
+
+    def format_report(self, report=None):
+        report = report or self.report()
+        lines = [f"{'target':<40}{'calls':>9}{'total':>12}{'mean':>12}{'p50':>12}{'p95':>12}{'p99':>12}"
+                 + (f"{'blocks':>10}" if report['allocations'] else "")]
+        rows = sorted(report['targets'].items(), key=lambda item: item[1]['total'], reverse=True)
+        for name, row in rows:
+            lines.append(f"{name:<40}{row['calls']:>9}{_format(row['total'])}{_format(row['mean'])}"
+                         f"{_format(row['p50'])}{_format(row['p95'])}{_format(row['p99'])}"
+                         + (f"{row['blocks']:>10}" if report['allocations'] else ""))
+        lines.append(f"{len(rows)} target(s) called in {report['elapsed']:.2f}s")
+        return "\n".join(lines)
+
+    def dump(self):
+        """Write the report as text to ``stream`` and as JSON to ``json_path``, if set."""
+        report = self.report()
+        print(self.format_report(report), file=self.stream, flush=True)
+        if self.json_path:
+            with open(self.json_path, "w") as f:
+                json.dump(report, f, indent=2)
+        return report
+
+    def install_signal(self, signum=None):
+        # SIGUSR1 by default; not every platform has it
+        signum = signum or getattr(signal, "SIGUSR1", None)
+        if signum is not None:
+            signal.signal(signum, lambda *_: self.dump())
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc):
+        self.disable()
+
+
+def game_over():
+    # Called by the console game and the GUI when a game ends; free when nothing is enabled
+    if _active is not None:
+        _active.dump()
+
+
+def _format(seconds):
+    if seconds >= 1:
+        return f"{seconds:10.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:9.3f} ms"
+    if seconds >= 1e-6:
+        return f"{seconds * 1e6:9.3f} us"
+    return f"{seconds * 1e9:9.1f} ns"
+
+
+def capture(seed=0, board="list", strategies=("hunt_target", "hunt_target"), out=None, top=15, stream=None, warm=True):
+    """Play one headless match under cProfile and tracemalloc and print both.
+
+    With ``warm`` the match is played once beforehand, so one-off work such
+    as building the shared placement tables stays out of the capture.
+    """
+    import cProfile
+    import pstats
+    import tracemalloc
+    from simulation import play_game
+    from tournament import BOARD_CLASSES, STRATEGIES
+
+    stream = stream or sys.stdout
+    players = [STRATEGIES[name] for name in strategies]
+    if warm:
+        play_game(players[0], players[1], seed, BOARD_CLASSES[board])
+    tracemalloc.start(10)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        winner, shots = play_game(players[0], players[1], seed, BOARD_CLASSES[board])
+        profiler.disable()
+        allocations = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    print(f"Match {seed}: {strategies[winner]} won in {shots} shots; peak traced memory {peak / 1024:.1f} KiB", file=stream)
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+    print(f"Top {top} allocation sites:", file=stream)
+    for stat in allocations.statistics("lineno")[:top]:
+        print(f"  {stat}", file=stream)
+    if out:
+        profiler.dump_stats(out)
+        print(f"cProfile data written to {out} (view with python -m pstats {out})", file=stream)
+    return winner, shots
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run Battleship with hot-path instrumentation")
+    parser.add_argument("mode", choices=("console", "gui", "capture"))
+    parser.add_argument("--json", dest="json_path", help="also write each report as JSON to this file")
+    parser.add_argument("--allocations", action="store_true", help="count net allocated blocks per call")
+    parser.add_argument("--board", choices=("list", "bit", "sparse"), default="list")
+    parser.add_argument("--seed", type=int, default=0, help="capture: match seed")
+    parser.add_argument("--strategies", nargs=2, default=("hunt_target", "hunt_target"), metavar="NAME",
+                        help="capture: the two strategies to pit against each other")
+    parser.add_argument("--out", help="capture: write cProfile data to this file")
+    parser.add_argument("--cold", action="store_true", help="capture: include one-off setup such as placement tables")
+    args = parser.parse_args(argv)
+
+    if args.mode == "capture":
+        capture(args.seed, args.board, args.strategies, args.out, warm=not args.cold)
+        return 0
+
+    # Not tournament's board map: it would load NumPy and the bots into the game being profiled
+    from main import board_class as load_board_class
+
+    board_class = load_board_class(args.board)
+    if args.mode == "gui":
+        import tkinter as tk
+        from gui_test import BattleshipGUI
+    else:
+        from game import BattleShipGame
+
+    with Instrumentation(allocations=args.allocations, json_path=args.json_path) as instrumentation:
+        instrumentation.install_signal()
+        if args.mode == "gui":
+            root = tk.Tk()
+            root.configure(bg='#F4A460')
+            BattleshipGUI(root, board_class)
+            root.mainloop()
+        else:
+            BattleShipGame(board_class).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Bot-swarm load generator for the asyncio match server.
+
+Opens ``--clients`` bot connections to a match server on localhost (one
+is started in this process unless ``--port`` points at a running one),
+lets them play every match to the end and reports matches per second
+(counting only matches whose winner was told the fleet was sunk),
+the latency of each attack round trip (p50/p95/p99) and the memory used
+per concurrent match. Memory is measured with tracemalloc, which traces
+the whole process: the figure covers the server's game state and
+connection buffers but also the bot clients' coroutines, sockets and
+latency samples, so it overstates what the server alone needs per match.
+
+    python loadgen.py --clients 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import tracemalloc
+
+from netplay import MatchServer
+
+
+async def bot_client(host, port, name, seed, latencies):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port, limit=1 << 16)
+
+    async def send(message):
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+
+    await send({'type': 'hello', 'name': name})
+    cells = []
+    sent_at = None
+    number = None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return None
+            message = json.loads(line)
+            kind = message.get('type')
+            if kind == 'matched':
+                number = message['player']
+                size = 10
+                cells = [(r, c) for r in range(size) for c in range(size)]
+                rng.shuffle(cells)
+                await send({'type': 'fleet', 'auto': True, 'seed': rng.randrange(1 << 30)})
+            elif kind == 'your_turn':
+                row, col = cells.pop()
+                sent_at = time.perf_counter()
+                await send({'type': 'attack', 'row': row, 'col': col})
+            elif kind == 'result' and sent_at is not None:
+                latencies.append(time.perf_counter() - sent_at)
+                sent_at = None
+            elif kind == 'game_over':
+                return dict(message, player=number)
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * (len(values) - 1) + 0.5))]
+
+
+async def run_load(clients, host="127.0.0.1", port=None, turn_timeout=30.0, seed=0, measure_memory=True):
+    server = None
+    if port is None:
+        if measure_memory:
+            tracemalloc.start()
+        server = MatchServer(turn_timeout)
+        await server.start(host, 0)
+        port = server.port
+        baseline = tracemalloc.get_traced_memory()[0] if measure_memory else 0
+    latencies = []
+    start = time.perf_counter()
+    results = await asyncio.gather(*(bot_client(host, port, f"bot{i}", seed + i, latencies) for i in range(clients)),
+                                   return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    # Each match is counted once, by the game_over its winner received
+    endings = [result['reason'] for result in results
+               if isinstance(result, dict) and result['player'] == result['winner']]
+    matches = endings.count("fleet sunk")
+    report = {
+        'clients': clients,
+        'matches': matches,
+        'forfeits': len(endings) - matches,
+        'elapsed': elapsed,
+        'matches_per_second': matches / elapsed if elapsed else 0.0,
+        'moves': len(latencies),
+        'latency_p50_ms': percentile(latencies, 0.50) * 1e3,
+        'latency_p95_ms': percentile(latencies, 0.95) * 1e3,
+        'latency_p99_ms': percentile(latencies, 0.99) * 1e3,
+        'errors': sum(isinstance(result, BaseException) for result in results),
+    }
+    if server is not None:
+        report['peak_concurrent_matches'] = server.peak_matches
+        if measure_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            report['memory_per_match_kb'] = (peak - baseline) / max(server.peak_matches, 1) / 1024
+        await server.stop()
+    return report
+
+
+def raise_file_limit(wanted):
+    # Every bot uses a socket, plus one on the server side when in-process
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < wanted:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(wanted, hard), hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bot-swarm load test for the match server")
+    parser.add_argument("--clients", type=int, default=1000, help="bot connections (two per match)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None, help="use a running server instead of an in-process one")
+    parser.add_argument("--turn-timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc (faster)")
+    args = parser.parse_args(argv)
+
+    raise_file_limit(args.clients * 2 + 64)
+    report = asyncio.run(run_load(args.clients, args.host, args.port, args.turn_timeout, args.seed,
+                                  measure_memory=not args.no_memory))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,145 @@
-import tkinter as tk
-from gui_test import BattleshipGUI
+"""Battleship entry point.
 
-def main():
-    root = tk.Tk()
+    python main.py                      # GUI
+    python main.py console --board bit --size 20
+    python main.py simulate --games 10000 --workers 8
+    python main.py batch --games 100000
+    python main.py bench headless_game --memory
+    python main.py imports              # import cost of every mode
+
+Each mode imports only what it needs, so the console game, simulations
+and benchmarks never load Tk or Pillow, and NumPy is only loaded for the
+computer opponent, the batch engine or to read move logs. ``--import-times``, given before
+the mode, reports how long the mode took to import and which heavy
+modules it pulled in.
+"""
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+MODES = {
+    'gui': ('tkinter', 'gui_test'),
+    'console': ('game',),
+    'simulate': ('simulation',),
+    'batch': ('batch',),
+    'bench': ('bench',),
+}
+HEAVY_MODULES = ('tkinter', 'PIL', 'numpy')
+BOARD_CLASSES = {'list': 'Board', 'bit': 'BitBoard', 'sparse': 'SparseBoard'}
+
+
+def load(mode):
+    """Import the modules ``mode`` needs and return them with the seconds it took."""
+    start = time.perf_counter()
+    modules = [importlib.import_module(name) for name in MODES[mode]]
+    return modules, time.perf_counter() - start
+
+
+def heavy_modules():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def board_class(name):
+    # Board modules are small; only the chosen one is imported
+    module = BOARD_CLASSES[name]
+    return getattr(importlib.import_module(module), module)
+
+
+def measure_imports(modes=MODES):
+    """Import time per mode, each in a fresh interpreter so earlier imports hide nothing."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for mode in modes:
+        code = f"import json, main; _, s = main.load({mode!r}); print(json.dumps([s, main.heavy_modules()]))"
+        run = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True)
+        if run.returncode:
+            error = run.stderr.strip().splitlines()
+            results[mode] = {'error': error[-1] if error else f"exit status {run.returncode}"}
+        else:
+            seconds, heavy = json.loads(run.stdout.splitlines()[-1])
+            results[mode] = {'seconds': seconds, 'heavy': heavy}
+    return results
+
+
+def run_gui(argv, modules):
+    parser = argparse.ArgumentParser(prog="main.py gui", description="Play Battleship in a window")
+    parser.add_argument("--board", choices=BOARD_CLASSES, default="list")
+    args = parser.parse_args(argv)
+    tk, gui_test = modules
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Cannot open a window ({e}); try: python main.py console", file=sys.stderr)
+        return 1
     root.configure(bg='#F4A460')  # Sand-colored background
-    app = BattleshipGUI(root)
+    gui_test.BattleshipGUI(root, board_class(args.board))
     root.mainloop()
+    return 0
 
-if __name__ == "__main__":
-    main()
 
+def run_console(argv, modules):
+    parser = argparse.ArgumentParser(prog="main.py console", description="Play Battleship in the terminal")
+    parser.add_argument("--board", choices=BOARD_CLASSES, default="list")
+    parser.add_argument("--size", type=int, default=None, help="board size (default: the standard 10)")
+    args = parser.parse_args(argv)
+    (game,) = modules
+    options = {'size': args.size} if args.size else {}
+    try:
+        game.BattleShipGame(board_class(args.board), **options).run()
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+def run_simulate(argv, modules):
+    (simulation,) = modules
+    return simulation.main(argv)
+
+
+def run_batch(argv, modules):
+    (batch,) = modules
+    return batch.main(argv)
+
+
+def run_bench(argv, modules):
+    (bench,) = modules
+    return bench.main(argv)
 
-# for console version uncomment the part below
-"""
-from game import BattleShipGame
 
-def main():
+RUNNERS = {'gui': run_gui, 'console': run_console, 'simulate': run_simulate, 'batch': run_batch, 'bench': run_bench}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Battleship", epilog="Options after the mode go to that mode; "
+                                     "try python main.py console --help")
+    parser.add_argument("mode", nargs="?", default="gui", choices=list(RUNNERS) + ["imports"])
+    parser.add_argument("--import-times", action="store_true", help="report how long the mode took to import")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.mode == "imports":
+        for mode, result in measure_imports().items():
+            if 'error' in result:
+                print(f"{mode:<10} failed: {result['error']}")
+            else:
+                print(f"{mode:<10} {result['seconds'] * 1e3:8.1f} ms  heavy: {', '.join(result['heavy']) or 'none'}")
+        return 0
+
     try:
-        battleship = BattleShipGame()
-        battleship.run()
+        modules, seconds = load(args.mode)
     except ImportError as e:
-        print(f"Error importing game modules: {e}")
-        print("\nMake sure all game files are in the same directory.")
-    except Exception as e:
-        print(f"Error: {e}")
+        print(f"The {args.mode} mode needs {e.name}, which is not installed", file=sys.stderr)
+        return 1
+    if args.import_times:
+        print(f"{args.mode}: imports took {seconds * 1e3:.1f} ms; heavy modules: {', '.join(heavy_modules()) or 'none'}",
+              file=sys.stderr)
+    return RUNNERS[args.mode](args.args, modules)
+
 
 if __name__ == "__main__":
-    main()
-"""
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""Memoized targeting maps for the density bot.
+
+Simulated matches keep reaching the same early positions: the bot's first
+few shots and their outcomes on the standard fleet. :class:`DensityCache`
+stores :func:`bot.density_map` results keyed by what is known about the
+opponent's grid (unknown, miss, hit on a ship afloat, sunk ship) and the
+ship sizes still afloat. The 8 rotations and reflections of a board give
+the same map turned the same way, so the key is the smallest of the 8
+transformed grids and one entry serves all of them.
+
+The cache is a bounded LRU and reports its hit rate and memory use. It can
+be saved and loaded as an opening book; positions with more than
+``max_shots`` shots, which hardly ever repeat, bypass it.
+
+    python mapcache.py build --games 500 --max-shots 12 --out opening.npz
+    python mapcache.py bench --games 200 --seed 500 --book opening.npz  # games the book has not seen
+"""
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from bot import density_strategy, observed_state, remaining_sizes, state_density
+
+MAX_ENTRIES = 50000
+# Positions with more shots than this hardly ever repeat; they skip the cache
+MAX_SHOTS = 12
+BOOK_PATH = "opening.npz"
+
+_PERMUTATIONS = {}
+
+
+def permutations(size):
+    """``(8, size * size)`` flat cell indices of each board symmetry and of its inverse.
+
+    ``grid.ravel()[forward[t]]`` is the grid turned by symmetry ``t``, and
+    ``turned.ravel()[inverse[t]]`` turns it back.
+    """
+    pair = _PERMUTATIONS.get(size)
+    if pair is None:
+        cells = np.arange(size * size).reshape(size, size)
+        forward = []
+        for transform in range(8):
+            turned = np.rot90(cells, transform % 4)
+            forward.append((turned[:, ::-1] if transform >= 4 else turned).ravel())
+        forward = np.array(forward)
+        pair = _PERMUTATIONS[size] = (forward, np.argsort(forward, axis=1))
+    return pair
+
+
+def canonical(state):
+    """The smallest of the 8 symmetric versions of ``state`` as bytes, and the symmetry that gives it."""
+    forward, _ = permutations(state.shape[0])
+    turned = state.ravel()[forward]
+    keys = [row.tobytes() for row in turned]
+    transform = min(range(8), key=keys.__getitem__)
+    return keys[transform], transform
+
+
+class DensityCache:
+    def __init__(self, max_entries=MAX_ENTRIES, max_shots=MAX_SHOTS):
+        self.max_entries = max_entries
+        self.max_shots = max_shots
+        self.entries = OrderedDict()  # (sizes, grid bytes) -> read-only flat density, least recent first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def density_map(self, view, sizes=None):
+        """Same result as :func:`bot.density_map`, from the cache when the position was seen before."""
+        state = observed_state(view)
+        if sizes is None:
+            sizes = remaining_sizes(view)
+        return self.state_density(state, sizes)
+
+    def state_density(self, state, sizes):
+        size = state.shape[0]
+        if self.max_shots is not None and np.count_nonzero(state) > self.max_shots:
+            self.bypassed += 1
+            return state_density(state, sizes)
+        grid, transform = canonical(state)
+        key = (tuple(sorted(sizes)), grid)
+        density = self.entries.get(key)
+        if density is None:
+            self.misses += 1
+            turned = np.frombuffer(grid, dtype=np.uint8).reshape(size, size)
+            # Stored as int32 to halve the memory; the counts are far below 2**31
+            density = state_density(turned, list(sizes)).ravel().astype(np.int32)
+            self._store(key, density)
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        _, inverse = permutations(size)
+        return density[inverse[transform]].astype(np.int64).reshape(size, size)
+
+    def _store(self, key, density):
+        density.flags.writeable = False
+        self.entries[key] = density
+        self.nbytes += _entry_bytes(key, density)
+        while len(self.entries) > self.max_entries:
+            old_key, old = self.entries.popitem(last=False)
+            self.nbytes -= _entry_bytes(old_key, old)
+            self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'bypassed': self.bypassed,
+            'bytes': self.nbytes,
+        }
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = self.bypassed = 0
+
+    def save(self, path=BOOK_PATH):
+        """Write every entry to an ``.npz`` opening book, least recently used first."""
+        groups = {}
+        for (sizes, grid), density in self.entries.items():
+            groups.setdefault(len(grid), []).append((sizes, grid, density))
+        arrays = {}
+        for cells, entries in groups.items():
+            width = max(len(sizes) for sizes, _, _ in entries)
+            arrays[f"sizes_{cells}"] = np.array([sizes + (0,) * (width - len(sizes)) for sizes, _, _ in entries],
+                                                dtype=np.int16).reshape(len(entries), width)
+            arrays[f"grids_{cells}"] = np.frombuffer(b"".join(grid for _, grid, _ in entries),
+                                                     dtype=np.uint8).reshape(len(entries), cells)
+            arrays[f"maps_{cells}"] = np.array([density for _, _, density in entries])
+        np.savez_compressed(path, **arrays)
+
+    def load(self, path=BOOK_PATH):
+        """Add the entries of an opening book written by :meth:`save`; returns how many were read."""
+        count = 0
+        with np.load(path) as book:
+            for name in book.files:
+                if not name.startswith("grids_"):
+                    continue
+                cells = name[len("grids_"):]
+                grids, maps, sizes = book[name], book[f"maps_{cells}"], book[f"sizes_{cells}"]
+                for grid, density, ship_sizes in zip(grids, maps, sizes):
+                    key = (tuple(int(length) for length in ship_sizes if length), grid.tobytes())
+                    if key not in self.entries:
+                        self._store(key, density.astype(np.int32))
+                    count += 1
+        return count
+
+
+def _entry_bytes(key, density):
+    sizes, grid = key
+    return sys.getsizeof(sizes) + sys.getsizeof(grid) + density.nbytes
+
+
+CACHE = DensityCache()
+
+
+def cached_density_strategy(view, rng):
+    # density_strategy with the process-wide cache; picklable for simulation workers
+    return density_strategy(view, rng, CACHE)
+
+
+def build_book(games, max_shots=MAX_SHOTS, seed=0, max_entries=MAX_ENTRIES, board_class=None):
+    """Play ``games`` density-vs-density games and return a cache of their openings."""
+    from Board import Board
+    from simulation import play_game
+
+    global CACHE
+    previous, CACHE = CACHE, DensityCache(max_entries, max_shots)
+    try:
+        for game in range(seed, seed + games):
+            play_game(cached_density_strategy, cached_density_strategy, game, board_class or Board, first=game % 2)
+        return CACHE
+    finally:
+        CACHE = previous
+
+
+def compare(games, seed=0, cache=None, board_class=None):
+    """Time ``games`` density-vs-density games without and with ``cache``; the results must match."""
+    from Board import Board
+    from simulation import play_game
+
+    global CACHE
+    board_class = board_class or Board
+    start = time.perf_counter()
+    plain = [play_game(density_strategy, density_strategy, game, board_class, first=game % 2)
+             for game in range(seed, seed + games)]
+    uncached = time.perf_counter() - start
+    previous, CACHE = CACHE, cache or DensityCache()
+    try:
+        start = time.perf_counter()
+        cached = [play_game(cached_density_strategy, cached_density_strategy, game, board_class, first=game % 2)
+                  for game in range(seed, seed + games)]
+        elapsed = time.perf_counter() - start
+        stats = CACHE.stats()
+    finally:
+        CACHE = previous
+    return {'games': games, 'uncached': uncached, 'cached': elapsed, 'same_results': plain == cached, 'stats': stats}
+
+
+def _print_stats(stats):
+    print(f"{stats['entries']} entries ({stats['bytes'] / 1024:.0f} KiB), hit rate {stats['hit_rate']:.1%} "
+          f"({stats['hits']} hits, {stats['misses']} misses), {stats['evictions']} evicted, "
+          f"{stats['bypassed']} past the shot limit")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build and measure the density bot's map cache")
+    parser.add_argument("mode", choices=("build", "bench"))
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-entries", type=int, default=MAX_ENTRIES)
+    parser.add_argument("--max-shots", type=int, default=MAX_SHOTS,
+                        help="only cache positions with at most this many shots")
+    parser.add_argument("--out", default=BOOK_PATH, help="build: opening book to write")
+    parser.add_argument("--book", help="bench: start from this opening book")
+    args = parser.parse_args(argv)
+
+    if args.mode == "build":
+        start = time.perf_counter()
+        cache = build_book(args.games, args.max_shots, args.seed, args.max_entries)
+        cache.save(args.out)
+        print(f"{args.games} games in {time.perf_counter() - start:.2f}s; wrote {args.out}")
+        _print_stats(cache.stats())
+        return 0
+
+    cache = DensityCache(args.max_entries, args.max_shots)
+    if args.book:
+        print(f"Loaded {cache.load(args.book)} positions from {args.book}")
+    result = compare(args.games, args.seed, cache)
+    speedup = result['uncached'] / result['cached'] if result['cached'] else 0.0
+    print(f"{args.games} density games: {result['uncached']:.2f}s uncached, {result['cached']:.2f}s cached "
+          f"({speedup:.2f}x), identical results: {result['same_results']}")
+    _print_stats(result['stats'])
+    return 0 if result['same_results'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Rules for one two-player match, independent of how players connect.
+
+:class:`GameSession` validates fleets, enforces turn order and reports
+attack results as plain dictionaries, so the REST server and the TCP
+match server share exactly the same rules.
+"""
+import random
+import threading
+import time
+from collections import Counter
+
+from BitBoard import BitBoard
+from Player import Player
+from config import FLEET, ship_types
+from fleet import place_fleet, random_layout
+
+SHIP_TYPES = ship_types(FLEET)
+
+
+class GameError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class GameSession:
+    def __init__(self, game_id, player1_name, player2_name, board_class=BitBoard):
+        self.game_id = game_id
+        self.board_class = board_class
+        self.players = [Player(player1_name, board_class(), board_class()),
+                        Player(player2_name, board_class(), board_class())]
+        self.fleet_placed = [False, False]
+        self.phase = "placement"
+        self.turn = 0
+        self.winner = None
+        self.moves = 0
+        self.lock = threading.Lock()
+        self.last_active = time.monotonic()
+
+    def player_index(self, number):
+        if number not in (1, 2):
+            raise GameError("Player must be 1 or 2", 404)
+        return number - 1
+
+    def place_fleet(self, number, payload):
+        index = self.player_index(number)
+        if self.phase != "placement":
+            raise GameError("Ships can only be placed before the battle", 409)
+        if self.fleet_placed[index]:
+            raise GameError("Fleet already placed", 409)
+        board = self.board_class()
+        if payload.get("auto"):
+            seed = payload.get("seed")
+            if seed is not None and not isinstance(seed, int):
+                raise GameError("'seed' must be an integer")
+            layout = random_layout(board, rng=random.Random(seed))
+        else:
+            layout = self._parse_layout(board, payload.get("ships"))
+        place_fleet(board, layout)
+        self.players[index].board = board
+        self.fleet_placed[index] = True
+        if all(self.fleet_placed):
+            self.phase = "battle"
+
+    def _parse_layout(self, board, ships):
+        if not isinstance(ships, list):
+            raise GameError("'ships' must be a list")
+        layout = []
+        counts = Counter()
+        for entry in ships:
+            try:
+                ship_class = SHIP_TYPES[entry["type"]]
+                row, col = int(entry["row"]), int(entry["col"])
+                orientation = str(entry.get("orientation", "H")).upper()
+            except (KeyError, TypeError, ValueError):
+                raise GameError(f"Invalid ship entry: {entry!r}")
+            if orientation not in ("H", "V"):
+                raise GameError("Orientation must be 'H' or 'V'")
+            size = ship_class().size
+            if board.placement.footprint(size, orientation, row, col) is None:
+                raise GameError(f"{ship_class.__name__} at ({row}, {col}) is out of board bounds")
+            if not board.can_place(size, orientation, row, col):
+                raise GameError("Ships cannot touch each other, even diagonally")
+            # Place on the scratch board so later entries are checked against earlier ones
+            place_fleet(board, [(ship_class, orientation, row, col)])
+            layout.append((ship_class, orientation, row, col))
+            counts[ship_class] += 1
+        expected = {ship_class: count for ship_class, count in FLEET}
+        if counts != Counter(expected):
+            wanted = ", ".join(f"{count} {ship_class.__name__}" for ship_class, count in FLEET)
+            raise GameError(f"Fleet must be exactly: {wanted}")
+        return layout
+
+    def attack(self, number, payload):
+        index = self.player_index(number)
+        if self.phase != "battle":
+            raise GameError("The battle has not started" if self.phase == "placement" else "The game is over", 409)
+        if index != self.turn:
+            raise GameError("It is not your turn", 409)
+        try:
+            row, col = int(payload["row"]), int(payload["col"])
+        except (KeyError, TypeError, ValueError):
+            raise GameError("'row' and 'col' must be integers")
+        attacker, defender = self.players[index], self.players[1 - index]
+        if not (0 <= row < defender.board.size and 0 <= col < defender.board.size):
+            raise GameError("Attack is out of board bounds")
+        result = attacker.fire(defender, row, col)
+        if result.outcome == "repeat":
+            raise GameError("Already attacked this position", 409)
+        self.moves += 1
+        if result.remaining == 0:
+            self.phase = "over"
+            self.winner = index
+        elif result.outcome != "hit":
+            self.turn = 1 - index
+        return {
+            'outcome': result.outcome,
+            'sunk': result.sunk,
+            'ship': result.ship.__class__.__name__ if result.sunk else None,
+            'remaining': result.remaining,
+            'next_player': None if self.phase == "over" else self.turn + 1,
+            'winner': None if self.winner is None else self.winner + 1,
+        }
+
+    def forfeit(self, number):
+        index = self.player_index(number)
+        if self.phase != "over":
+            self.phase = "over"
+            self.winner = 1 - index
+
+    def status(self, number=None):
+        status = {
+            'game_id': self.game_id,
+            'player1_name': self.players[0].name,
+            'player2_name': self.players[1].name,
+            'phase': self.phase,
+            'fleet_placed': list(self.fleet_placed),
+            'current_player': self.turn + 1 if self.phase == "battle" else None,
+            'game_over': self.phase == "over",
+            'winner': self.players[self.winner].name if self.winner is not None else None,
+            'moves': self.moves,
+        }
+        if number is not None:
+            player = self.players[self.player_index(number)]
+            status['board'] = [''.join(player.board.cell(r, c) for c in range(player.board.size))
+                               for r in range(player.board.size)]
+            status['opponent_board'] = [''.join(player.opponent_board.cell(r, c) for c in range(player.opponent_board.size))
+                                        for r in range(player.opponent_board.size)]
+        return status
@@ -0,0 +1,363 @@
+"""Append-only binary move log shared by many games, with mmap replay.
+
+The file is an 8-byte header followed by fixed-width 14-byte records
+(little-endian)::
+
+    game:u64  seq:u16  op:u8  row:u8  col:u8  arg:u8
+
+A game id is a random 32-bit writer session in the high half and the
+writer's own game counter in the low half, so writers in any number of
+processes never hand out the same id without coordinating. Logs of older
+versions can still be read but not appended to: version 1 has 32-bit ids,
+and neither it nor version 2 records player names.
+
+``op`` holds the record kind in bits 0-2 and the player (0 or 1) in bit 3
+(bits 0-1 and bit 2 before version 3).
+
+    start  row = board size, arg bit 0 = player 2 is the computer,
+           arg bit 1 = resumed from a snapshot
+    name   the next 3 bytes of ``player``'s UTF-8 name in row/col/arg,
+           zero-padded; up to 255 bytes, written right after the start
+    place  one ship: row/col of its first cell, arg = size | 0x80 if vertical
+    shot   row/col fired at by ``player``, arg = 0 miss, 1 hit, 2 sunk
+    end    ``player`` won
+
+Writers open the file with ``O_APPEND`` and write whole records in one
+call, so any number of games and processes can share a log. Records of
+different games may interleave; on first use the reader sorts the
+memory-mapped ``game`` column once into an index of each game's records,
+so a game is then found with a binary search and nothing is parsed until
+a move is actually replayed.
+
+    python movelog.py battleship.log
+    python movelog.py battleship.log --game 3 --move 40
+"""
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+from Board import Board
+from Player import Player
+from Ship import Orientation
+from snapshot import SHIP_BY_SIZE
+
+LOG_FILE = "battleship.log"
+MAGIC = b"BSMOVE"
+VERSION = 3
+START, PLACE, SHOT, END, NAME = range(5)
+KINDS = ("start", "place", "shot", "end", "name")
+OUTCOMES = ("miss", "hit", "sunk")
+
+_HEADER = struct.Struct("<6sBB")
+_RECORD = struct.Struct("<QHBBBB")
+# NumPy dtype fields of a record per version; NumPy itself is only loaded to read a log
+RECORD_FIELDS = {
+    1: [('game', '<u4'), ('seq', '<u2'), ('op', 'u1'), ('row', 'u1'), ('col', 'u1'), ('arg', 'u1')],
+    2: [('game', '<u8'), ('seq', '<u2'), ('op', 'u1'), ('row', 'u1'), ('col', 'u1'), ('arg', 'u1')],
+}
+RECORD_FIELDS[3] = RECORD_FIELDS[2]
+_RECORD_SIZES = {1: 10, 2: _RECORD.size, 3: _RECORD.size}
+# Mask of the record kind in ``op`` and the shift of the player bit, per version
+_OP_LAYOUT = {1: (3, 2), 2: (3, 2), 3: (7, 3)}
+PLAYER_SHIFT = _OP_LAYOUT[VERSION][1]
+
+Move = namedtuple("Move", ["game", "seq", "kind", "player", "row", "col", "arg"])
+
+
+class MoveLogError(ValueError):
+    pass
+
+
+def _parse_header(data):
+    # Returns the version of a log header
+    magic, version, record_size = _HEADER.unpack(data)
+    if magic != MAGIC:
+        raise MoveLogError("Not a Battleship move log")
+    if version not in _RECORD_SIZES:
+        raise MoveLogError(f"Unsupported move log version {version}")
+    if record_size != _RECORD_SIZES[version]:
+        raise MoveLogError("Not a Battleship move log")
+    return version
+
+
+def _check_header(path):
+    with open(path, "rb") as f:
+        data = f.read(_HEADER.size)
+    if len(data) < _HEADER.size:
+        raise MoveLogError("Move log is truncated")
+    if _parse_header(data) != VERSION:
+        raise MoveLogError(f"{path} was written by an older version; start a new move log to record games")
+
+
+class MoveLog:
+    """Appends games to a log file; use :meth:`start_game` per game."""
+
+    def __init__(self, path=LOG_FILE):
+        self.path = path
+        self.fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(self.fd).st_size == 0:
+                os.write(self.fd, _HEADER.pack(MAGIC, VERSION, _RECORD.size))
+            else:
+                _check_header(path)
+        except (OSError, MoveLogError):
+            self.close()
+            raise
+        self.session = int.from_bytes(os.urandom(4), "little")
+        self._next_game = 0
+
+    def next_game_id(self):
+        # Unique across writers without reading the log: session in the high 32 bits
+        game_id = self.session << 32 | self._next_game
+        self._next_game = (self._next_game + 1) & 0xFFFFFFFF
+        return game_id
+
+    def start_game(self, player1, player2, game_id=None, vs_computer=False, resumed=False, buffered=False):
+        """Start recording a game whose fleets are already placed.
+
+        Shots are recorded through :meth:`Player.fire` until
+        :meth:`GameRecorder.end`. ``buffered`` recorders write the whole game
+        in one append at the end, which keeps each game contiguous.
+        """
+        if player1.board.size > 255:
+            raise MoveLogError("Move logs store rows and columns in one byte; boards up to 255 are supported")
+        if game_id is None:
+            game_id = self.next_game_id()
+        return GameRecorder(self, game_id, player1, player2, vs_computer, resumed, buffered)
+
+    def write(self, data):
+        os.write(self.fd, data)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameRecorder:
+    def __init__(self, log, game_id, player1, player2, vs_computer=False, resumed=False, buffered=False):
+        self.log = log
+        self.game_id = game_id
+        self.players = (player1, player2)
+        self.buffered = buffered
+        self.buffer = bytearray()
+        self.seq = 0
+        self._record(START, 0, player1.board.size, 0, vs_computer | resumed << 1)
+        for index, player in enumerate(self.players):
+            # Cut on a character boundary; NUL is the padding
+            name = player.name.replace("\0", "").encode("utf-8")[:255].decode("utf-8", "ignore").encode("utf-8")
+            name += bytes(-len(name) % 3)
+            for offset in range(0, len(name), 3):
+                self._record(NAME, index, *name[offset:offset + 3])
+        for index, player in enumerate(self.players):
+            for ship in player.board.ships:
+                row, col = ship.position[0]
+                vertical = ship.orientation == Orientation.VERTICAL
+                self._record(PLACE, index, row, col, ship.size | vertical << 7)
+        if resumed:
+            # The order of shots before the snapshot is lost; their effect is not
+            for index, player in enumerate(self.players):
+                view = player.opponent_board
+                for row in range(view.size):
+                    for col in range(view.size):
+                        mark = view.cell(row, col)
+                        if mark in ("X", "O"):
+                            self._record(SHOT, index, row, col, int(mark == "X"))
+        for player in self.players:
+            player.move_log = self
+        self.flush()
+
+    def _record(self, kind, player, row, col, arg):
+        self.buffer += _RECORD.pack(self.game_id, self.seq & 0xFFFF, kind | player << PLAYER_SHIFT, row, col, arg)
+        self.seq += 1
+        if not self.buffered:
+            self.flush()
+
+    def attack(self, player, row, col, result):
+        outcome = 2 if result.sunk else int(result.outcome == "hit")
+        self._record(SHOT, int(player is self.players[1]), row, col, outcome)
+
+    def end(self, winner):
+        self._record(END, int(winner is self.players[1]), 0, 0, 0)
+        self.flush()
+        for player in self.players:
+            player.move_log = None
+
+    def flush(self):
+        if self.buffer:
+            self.log.write(bytes(self.buffer))
+            self.buffer.clear()
+
+
+class ReplayLog:
+    """Read-only, memory-mapped view of a move log."""
+
+    def __init__(self, path=LOG_FILE):
+        import numpy as np
+
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        if size < _HEADER.size:
+            self.file.close()
+            raise MoveLogError("Move log is truncated")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.version = _parse_header(self.map[:_HEADER.size])
+        except MoveLogError:
+            self.close()
+            raise
+        dtype = np.dtype(RECORD_FIELDS[self.version])
+        self.kind_mask, self.player_shift = _OP_LAYOUT[self.version]
+        # A record still being appended by another writer is left out
+        count = (size - _HEADER.size) // dtype.itemsize
+        self.records = np.frombuffer(self.map, dtype, count, _HEADER.size)
+        self._order = None
+        self._ids = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def record(self, index):
+        game, seq, op, row, col, arg = self.records[index].item()
+        return Move(game, seq, KINDS[op & self.kind_mask], op >> self.player_shift & 1, row, col, arg)
+
+    def _index(self):
+        # Record indices grouped by game, in write order within a game, and the game id of each
+        if self._order is None:
+            ids = self.records['game']
+            self._order = ids.argsort(kind='stable')
+            self._ids = ids[self._order]
+        return self._order, self._ids
+
+    def games(self):
+        # Game ids in the order the games were started
+        import numpy as np
+
+        order, ids = self._index()
+        if not len(ids):
+            return []
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        return ids[starts[order[starts].argsort()]].tolist()
+
+    def positions(self, game):
+        # Record indices of one game, in the order they were written
+        order, ids = self._index()
+        # As the column's own type: a Python int would be compared as a float and lose the low bits
+        try:
+            key = ids.dtype.type(game)
+        except OverflowError:
+            return order[:0]
+        return order[ids.searchsorted(key, 'left'):ids.searchsorted(key, 'right')]
+
+    def moves(self, game):
+        return [self.record(index) for index in self.positions(game)]
+
+    def shot_count(self, game):
+        ops = self.records['op'][self.positions(game)]
+        return int((ops & self.kind_mask == SHOT).sum())
+
+    def replay(self, game, upto=None, board_class=Board, player_class=Player):
+        """Rebuild ``game`` as it stood after ``upto`` shots (all by default).
+
+        Returns a dict with ``player1``, ``player2``, ``turn`` (who fires
+        next), ``winner`` (0, 1 or None), ``vs_computer``, ``shots`` (how
+        many were replayed) and ``total`` (how many the game has).
+        """
+        positions = self.positions(game)
+        if not len(positions):
+            raise MoveLogError(f"No game {game} in the log")
+        records = self.records[positions]
+        kinds = records['op'] & self.kind_mask
+        sides = records['op'] >> self.player_shift & 1
+        size, flags = int(records['row'][0]), int(records['arg'][0])
+        if kinds[0] != START:
+            raise MoveLogError(f"Game {game} has no start record")
+        if (kinds == START).sum() > 1:
+            raise MoveLogError(f"Game {game} has more than one start record; two writers used the same id")
+        vs_computer = bool(flags & 1)
+        names = ["Player 1", "Computer" if vs_computer else "Player 2"]
+        for index in range(2):
+            # Logs before version 3 have no names and keep the defaults
+            chunks = records[(kinds == NAME) & (sides == index)][['row', 'col', 'arg']].tolist()
+            name = bytes(byte for chunk in chunks for byte in chunk).rstrip(b"\0")
+            if name:
+                names[index] = name.decode("utf-8", "replace")
+        players = [player_class(name, board_class(size), board_class(size)) for name in names]
+
+        placed = kinds == PLACE
+        for (_, _, _, row, col, arg), side in zip(records[placed].tolist(), sides[placed].tolist()):
+            ship = SHIP_BY_SIZE[arg & 0x7F]()
+            orientation = "V" if arg & 0x80 else "H"
+            players[side].board.place_ships(ship, ship.cells(row, col, orientation))
+            ship.orientation = Orientation(orientation)
+
+        shots = records[kinds == SHOT]
+        shooters = sides[kinds == SHOT].tolist()
+        total = len(shots)
+        upto = total if upto is None else max(0, min(upto, total))
+        turn = shooters[0] if total else 0
+        for (_, _, _, row, col, _), turn in zip(shots[:upto].tolist(), shooters):
+            result = players[turn].fire(players[1 - turn], row, col)
+            if result.outcome != "hit":
+                turn = 1 - turn
+        winner = None
+        ends = sides[kinds == END]
+        if len(ends) and upto == total:
+            winner = int(ends[0])
+        return {
+            'player1': players[0],
+            'player2': players[1],
+            'turn': turn,
+            'winner': winner,
+            'vs_computer': vs_computer,
+            'shots': upto,
+            'total': total,
+        }
+
+    def close(self):
+        self.records = None
+        self._order = self._ids = None
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List or replay games from a Battleship move log")
+    parser.add_argument("path", nargs="?", default=LOG_FILE)
+    parser.add_argument("--game", type=int, default=None, help="game to replay (default: list the games)")
+    parser.add_argument("--move", type=int, default=None, help="stop after this many shots (default: all)")
+    args = parser.parse_args()
+
+    with ReplayLog(args.path) as log:
+        if args.game is None:
+            print(f"{len(log)} records")
+            for game in log.games():
+                print(f"game {game}: {log.shot_count(game)} shots")
+        else:
+            state = log.replay(args.game, args.move)
+            print(f"Game {args.game} after {state['shots']} of {state['total']} shots")
+            for key in ('player1', 'player2'):
+                print(f"\n{state[key].name}'s fleet:")
+                state[key].board.display(hide_ships=False)
+            if state['winner'] is not None:
+                print(f"\n{state['player' + str(state['winner'] + 1)].name} won")
+            else:
+                print(f"\n{state['player' + str(state['turn'] + 1)].name} fires next")
@@ -0,0 +1,220 @@
+"""asyncio TCP match server with a lobby and matchmaking.
+
+Clients speak newline-delimited JSON. After connecting a client sends
+``{"type": "hello", "name": "Ann"}`` and waits in the lobby until the
+matchmaker pairs it with the next waiting client. Each match then runs
+as its own task:
+
+    server -> {"type": "matched", "player": 1, "opponent": "Bob"}
+    client -> {"type": "fleet", "auto": true, "seed": 7}   (or "ships": [...] as in server.py)
+    server -> {"type": "your_turn"}
+    client -> {"type": "attack", "row": 3, "col": 4}
+    server -> {"type": "result", "player": 1, "row": 3, "col": 4, "outcome": "hit", ...}   (sent to both)
+    server -> {"type": "game_over", "winner": 1, "reason": "fleet sunk"}
+
+Rules come from :class:`match.GameSession`. A player who does not answer
+within ``turn_timeout`` seconds, disconnects, or keeps sending invalid
+moves forfeits the match.
+"""
+import asyncio
+import json
+
+from match import GameError, GameSession
+
+MAX_ERRORS = 5
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.name = None
+
+    async def send(self, message):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+
+    async def receive(self, timeout=None):
+        line = await asyncio.wait_for(self.reader.readline(), timeout)
+        if not line:
+            raise ConnectionError("Connection closed")
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return {}
+        # Anything but a JSON object is as invalid as a line that does not parse
+        return message if isinstance(message, dict) else {}
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class MatchServer:
+    def __init__(self, turn_timeout=30.0):
+        self.turn_timeout = turn_timeout
+        self.lobby = asyncio.Queue()
+        self.matches = set()
+        self.matches_played = 0
+        self.peak_matches = 0
+        self._server = None
+        self._matchmaker = None
+
+    async def start(self, host="127.0.0.1", port=8765):
+        self._server = await asyncio.start_server(self.handle, host, port, limit=1 << 16, backlog=4096)
+        self._matchmaker = asyncio.create_task(self.matchmake())
+        return self._server
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._matchmaker.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+        for task in list(self.matches):
+            task.cancel()
+
+    async def handle(self, reader, writer):
+        conn = Connection(reader, writer)
+        try:
+            hello = await conn.receive(self.turn_timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            await conn.close()
+            return
+        conn.name = str(hello.get("name") or "Player")
+        await self.lobby.put(conn)
+
+    async def matchmake(self):
+        waiting = None
+        while True:
+            conn = await self.lobby.get()
+            if conn.reader.at_eof():
+                await conn.close()
+                continue
+            if waiting is None or waiting.reader.at_eof():
+                if waiting is not None:
+                    await waiting.close()
+                waiting = conn
+                continue
+            task = asyncio.create_task(self.run_match(waiting, conn))
+            self.matches.add(task)
+            self.peak_matches = max(self.peak_matches, len(self.matches))
+            task.add_done_callback(self.matches.discard)
+            waiting = None
+
+    async def run_match(self, first, second):
+        conns = (first, second)
+        session = GameSession(None, first.name, second.name)
+        reason = "fleet sunk"
+        try:
+            for number, conn in enumerate(conns, 1):
+                await conn.send({'type': 'matched', 'player': number, 'opponent': conns[2 - number].name})
+            await self.receive_fleets(session, conns)
+            while session.phase == "battle":
+                number = session.turn + 1
+                conn = conns[number - 1]
+                await conn.send({'type': 'your_turn'})
+                result = await self.receive_attack(session, number, conn)
+                for other in conns:
+                    await other.send(dict(result, type='result', player=number))
+        except _Forfeit as forfeit:
+            session.forfeit(forfeit.number)
+            reason = forfeit.reason
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if session.winner is not None:
+                for conn in conns:
+                    try:
+                        await conn.send({'type': 'game_over', 'winner': session.winner + 1, 'reason': reason})
+                    except (ConnectionError, OSError):
+                        pass
+            self.matches_played += 1
+            for conn in conns:
+                await conn.close()
+
+    async def receive_fleets(self, session, conns):
+        # Both players place at once; the first forfeit stops the other reader before the connections close
+        tasks = [asyncio.create_task(self.receive_fleet(session, number, conn)) for number, conn in enumerate(conns, 1)]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        for task in tasks:
+            if task in done:
+                task.result()
+
+    async def receive_fleet(self, session, number, conn):
+        for _ in range(MAX_ERRORS):
+            message = await self._receive(number, conn)
+            if message.get('type') != 'fleet':
+                await conn.send({'type': 'error', 'message': "Expected a 'fleet' message"})
+                continue
+            try:
+                session.place_fleet(number, message)
+                await conn.send({'type': 'fleet_ok'})
+                return
+            except GameError as e:
+                await conn.send({'type': 'error', 'message': str(e)})
+        raise _Forfeit(number, "too many invalid messages")
+
+    async def receive_attack(self, session, number, conn):
+        for _ in range(MAX_ERRORS):
+            message = await self._receive(number, conn)
+            if message.get('type') != 'attack':
+                await conn.send({'type': 'error', 'message': "Expected an 'attack' message"})
+                continue
+            try:
+                result = session.attack(number, message)
+            except GameError as e:
+                await conn.send({'type': 'error', 'message': str(e)})
+                continue
+            result.update(row=int(message['row']), col=int(message['col']))
+            return result
+        raise _Forfeit(number, "too many invalid messages")
+
+    async def _receive(self, number, conn):
+        try:
+            return await conn.receive(self.turn_timeout)
+        except asyncio.TimeoutError:
+            raise _Forfeit(number, "turn timeout")
+        except ConnectionError:
+            raise _Forfeit(number, "disconnected")
+
+
+class _Forfeit(Exception):
+    def __init__(self, number, reason):
+        super().__init__(reason)
+        self.number = number
+        self.reason = reason
+
+
+async def serve(host, port, turn_timeout):
+    server = MatchServer(turn_timeout)
+    await server.start(host, port)
+    print(f"Match server listening on {host}:{server.port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the Battleship TCP match server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--turn-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.turn_timeout))
+    except KeyboardInterrupt:
+        pass
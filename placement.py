@@ -0,0 +1,167 @@
+from config import MASK_BOARD_LIMIT
+
+
+def placement_for(size):
+    """Shared placement helper for a board of ``size``: bitmasks or cell sets."""
+    if size <= MASK_BOARD_LIMIT:
+        return PlacementMasks.for_size(size)
+    return PlacementSets.for_size(size)
+
+
+class PlacementMasks:
+    """Precomputed bitmasks for ship footprints on a square board.
+
+    Cell (row, col) maps to bit ``row * size + col``. For every ship size,
+    orientation and anchor cell the ship's own cells are stored as one mask,
+    and for every cell the 3x3 neighbourhood around it, so checking a
+    placement against a board's forbidden zone is a single ``&``.
+    Instances are shared between all boards of the same size.
+    """
+
+    _cache = {}
+
+    def __init__(self, size):
+        self.size = size
+        self.neighbours = []
+        self.halos = []
+        for row in range(size):
+            for col in range(size):
+                cells = [r * size + c
+                         for r in range(max(row - 1, 0), min(row + 2, size))
+                         for c in range(max(col - 1, 0), min(col + 2, size))]
+                mask = 0
+                for cell in cells:
+                    mask |= 1 << cell
+                self.neighbours.append(mask)
+                self.halos.append(cells)
+        self._footprints = {}
+        self._covering = {}
+        self._anchors = {}
+
+    @classmethod
+    def for_size(cls, size):
+        masks = cls._cache.get(size)
+        if masks is None:
+            masks = cls._cache[size] = cls(size)
+        return masks
+
+    def footprints(self, ship_size, orientation):
+        # One entry per anchor cell: the ship mask, or None if it runs off the board
+        key = (ship_size, orientation)
+        table = self._footprints.get(key)
+        if table is None:
+            size = self.size
+            step = 1 if orientation == "H" else size
+            line = 0
+            for i in range(ship_size):
+                line |= 1 << (i * step)
+            table = []
+            for row in range(size):
+                for col in range(size):
+                    end_row = row + (ship_size - 1 if orientation == "V" else 0)
+                    end_col = col + (ship_size - 1 if orientation == "H" else 0)
+                    if end_row < size and end_col < size:
+                        table.append(line << (row * size + col))
+                    else:
+                        table.append(None)
+            self._footprints[key] = table
+        return table
+
+    def anchors(self, ship_size, orientation):
+        # Anchors where the ship fits on an empty board
+        key = (ship_size, orientation)
+        anchors = self._anchors.get(key)
+        if anchors is None:
+            table = self.footprints(ship_size, orientation)
+            anchors = self._anchors[key] = frozenset(a for a, mask in enumerate(table) if mask is not None)
+        return anchors
+
+    def covering(self, ship_size, orientation):
+        # For every cell, the anchors whose footprint includes that cell
+        key = (ship_size, orientation)
+        table = self._covering.get(key)
+        if table is None:
+            size = self.size
+            table = [[] for _ in range(size * size)]
+            for anchor, mask in enumerate(self.footprints(ship_size, orientation)):
+                if mask is None:
+                    continue
+                row, col = divmod(anchor, size)
+                for i in range(ship_size):
+                    r = row + (i if orientation == "V" else 0)
+                    c = col + (i if orientation == "H" else 0)
+                    table[r * size + c].append(anchor)
+            self._covering[key] = table
+        return table
+
+    def halo(self, row, col):
+        # Indices of the cells in the 3x3 neighbourhood of (row, col)
+        return self.halos[row * self.size + col]
+
+    def footprint(self, ship_size, orientation, row, col):
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            return None
+        return self.footprints(ship_size, orientation)[row * self.size + col]
+
+    def empty_zone(self):
+        return 0
+
+    def zone(self, positions):
+        # Cells a ship at ``positions`` makes unavailable: itself plus its halo
+        zone = 0
+        for row, col in positions:
+            zone |= self.neighbours[row * self.size + col]
+        return zone
+
+
+class PlacementSets:
+    """Placement helper for boards too large for precomputed bitmasks.
+
+    Footprints and zones are sets of cell indices (``row * size + col``)
+    built on demand, so checking or placing a ship costs O(ship size) and
+    nothing proportional to the board's area is stored. Boards use it
+    exactly like :class:`PlacementMasks`: ``footprint & forbidden`` and
+    ``forbidden |= zone(...)`` work the same on sets as on ints.
+    """
+
+    _cache = {}
+
+    def __init__(self, size):
+        self.size = size
+
+    @classmethod
+    def for_size(cls, size):
+        sets = cls._cache.get(size)
+        if sets is None:
+            sets = cls._cache[size] = cls(size)
+        return sets
+
+    def footprint(self, ship_size, orientation, row, col):
+        size = self.size
+        end_row = row + (ship_size - 1 if orientation == "V" else 0)
+        end_col = col + (ship_size - 1 if orientation == "H" else 0)
+        if not (0 <= row and 0 <= col and end_row < size and end_col < size):
+            return None
+        step = 1 if orientation == "H" else size
+        start = row * size + col
+        return frozenset(range(start, start + ship_size * step, step))
+
+    def footprints(self, ship_size, orientation):
+        # Every anchor in turn; linear in the board's area, for whole-board views only
+        return [self.footprint(ship_size, orientation, row, col)
+                for row in range(self.size) for col in range(self.size)]
+
+    def halo(self, row, col):
+        size = self.size
+        return [r * size + c
+                for r in range(max(row - 1, 0), min(row + 2, size))
+                for c in range(max(col - 1, 0), min(col + 2, size))]
+
+    def zone(self, positions):
+        zone = set()
+        for row, col in positions:
+            zone.update(self.halo(row, col))
+        return zone
+
+    def empty_zone(self):
+        return set()
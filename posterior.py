@@ -0,0 +1,356 @@
+"""Exact per-cell ship probabilities over whole fleet layouts.
+
+The density bot scores every ship on its own. :func:`posterior` instead
+counts the complete layouts of the ships still afloat that agree with
+everything seen on the opponent's grid: no ship on a miss or next to a sunk
+ship, every hit covered, no two ships touching (the rule ``Ship.place_ship``
+enforces) and no afloat ship made only of hits, which would have sunk. A
+cell's probability is the share of those layouts with a ship on it.
+
+Counting is a depth-first search over bitmasks (bit ``row * size + col``,
+as in :mod:`placement`). While hits are uncovered it branches on the ships
+that could cover the first one, then places the rest largest first. Every
+sub-board it reaches (ships left, free cells, uncovered hits) is memoized
+with its layout count and per-cell counts, so equal sub-boards reached in a
+different order are counted once.
+
+Early in a game there are far too many layouts to count. When the search
+runs out of ``budget`` seconds the counts are estimated instead by random
+walks down the same search tree, weighted by their branching (Knuth's
+estimator), and the result carries a 95% error bound on the probabilities.
+The weights are what make the estimate cover layouts equally; the walks
+themselves, like :mod:`fleet`'s draws, favour some layouts over others.
+
+``posterior_strategy`` fires at the likeliest cell once exact counting
+fits in :data:`STRATEGY_BUDGET` and plays like the density bot before that.
+
+    python posterior.py --games 10 --budget 1
+"""
+import math
+import random
+import sys
+import time
+
+import numpy as np
+
+from bot import density_strategy, observed_masks, remaining_sizes
+from placement import PlacementMasks
+
+CHECK_EVERY = 1024  # search nodes between looks at the clock
+STRATEGY_BUDGET = 0.02
+Z_95 = 1.959964
+
+
+class Posterior:
+    __slots__ = ("probabilities", "exact", "layouts", "samples", "error", "elapsed")
+
+    def __init__(self, probabilities, exact, layouts, samples=0, error=0.0, elapsed=0.0):
+        self.probabilities = probabilities  # (size, size) floats; hits and sunk ships are 1, misses 0
+        self.exact = exact
+        self.layouts = layouts  # exact count, or the estimate when sampled
+        self.samples = samples
+        self.error = error  # largest 95% half-width over the cells; 0 when exact
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        kind = "exact" if self.exact else f"sampled x{self.samples}, +/-{self.error:.3f}"
+        return f"Posterior({kind}, layouts={self.layouts:.4g}, {self.elapsed * 1e3:.1f} ms)"
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class _Placements:
+    """Every footprint of each ship length with its no-touch zone, shared per board size."""
+
+    _cache = {}
+
+    def __init__(self, size):
+        self.size = size
+        self.by_length = {}
+        self.covering = {}
+
+    @classmethod
+    def for_size(cls, size):
+        placements = cls._cache.get(size)
+        if placements is None:
+            placements = cls._cache[size] = cls(size)
+        return placements
+
+    def of_length(self, length):
+        # [(mask, zone, cell indices)] for every position of a ship of ``length``
+        table = self.by_length.get(length)
+        if table is None:
+            masks = PlacementMasks.for_size(self.size)
+            footprints = set(masks.footprints(length, "H")) | set(masks.footprints(length, "V"))
+            footprints.discard(None)
+            table = []
+            for mask in sorted(footprints):
+                cells = [cell for cell in range(self.size * self.size) if mask >> cell & 1]
+                zone = 0
+                for cell in cells:
+                    zone |= masks.neighbours[cell]
+                table.append((mask, zone, np.array(cells)))
+            self.by_length[length] = table
+        return table
+
+    def covering_cell(self, length, cell):
+        table = self.covering.get(length)
+        if table is None:
+            table = [[] for _ in range(self.size * self.size)]
+            for placement in self.of_length(length):
+                for covered in placement[2]:
+                    table[covered].append(placement)
+            self.covering[length] = table
+        return table[cell]
+
+
+class LayoutCounter:
+    """Counts the layouts of ``sizes`` on the free cells ``avail`` that cover every cell of ``hits``.
+
+    ``avail`` and ``hits`` are integer bitmasks; hit cells must be in ``avail``.
+    """
+
+    def __init__(self, size, sizes, avail, hits):
+        self.size = size
+        self.cells = size * size
+        self.lengths = sorted(set(sizes), reverse=True)
+        self.counts = tuple(sizes.count(length) for length in self.lengths)
+        self.avail = avail
+        self.hits = hits
+        self.placements = _Placements.for_size(size)
+        self.memo = {}  # (counts, avail, uncovered hits) -> (layouts, per-cell layouts or None)
+        self.nodes = 0
+        self.deadline = None
+
+    def count(self, budget=None):
+        """Return (layouts, per-cell counts or None); raises _OutOfTime after ``budget`` seconds."""
+        self.deadline = None if budget is None else time.perf_counter() + budget
+        return self._count(self.counts, self.avail, self.hits)
+
+    def _tick(self):
+        self.nodes += 1
+        if self.deadline is not None and self.nodes % CHECK_EVERY == 0 and time.perf_counter() > self.deadline:
+            raise _OutOfTime
+
+    def _count(self, counts, avail, uncovered):
+        key = (counts, avail, uncovered)
+        found = self.memo.get(key)
+        if found is not None:
+            return found
+        self._tick()
+        if not uncovered:
+            # Same-length ships are placed in every order, so each layout
+            # turns up once per ordering; that divides out exactly
+            total, cover = self._free(counts, avail)
+            orderings = math.prod(math.factorial(count) for count in counts)
+            result = (total // orderings, None if cover is None else cover // orderings)
+        elif uncovered & ~avail or sum(map(int.__mul__, self.lengths, counts)) < bin(uncovered).count("1"):
+            result = (0, None)
+        else:
+            result = self._branch(counts, avail, uncovered, self._count)
+        self.memo[key] = result
+        return result
+
+    def _free(self, counts, avail):
+        # Ordered count of the layouts with no hits left to cover
+        key = (counts, avail)
+        found = self.memo.get(key)
+        if found is not None:
+            return found
+        self._tick()
+        if any(counts):
+            result = self._branch(counts, avail, 0, lambda rest, free, _: self._free(rest, free))
+        else:
+            result = (1, None)
+        self.memo[key] = result
+        return result
+
+    def _moves(self, counts, avail, uncovered):
+        # (index of the ship length, placement) pairs the search branches on
+        if uncovered:
+            cell = (uncovered & -uncovered).bit_length() - 1
+            for index, length in enumerate(self.lengths):
+                if counts[index]:
+                    for placement in self.placements.covering_cell(length, cell):
+                        mask = placement[0]
+                        # Entirely on hits would mean the ship had sunk
+                        if mask & avail == mask and mask & ~self.hits:
+                            yield index, placement
+        else:
+            index = next((i for i, count in enumerate(counts) if count), None)
+            if index is not None:
+                for placement in self.placements.of_length(self.lengths[index]):
+                    if placement[0] & avail == placement[0]:
+                        yield index, placement
+
+    def _branch(self, counts, avail, uncovered, recurse):
+        total = 0
+        cover = None
+        for index, (mask, zone, cells) in self._moves(counts, avail, uncovered):
+            rest = counts[:index] + (counts[index] - 1,) + counts[index + 1:]
+            layouts, sub_cover = recurse(rest, avail & ~zone, uncovered & ~mask)
+            if not layouts:
+                continue
+            if cover is None:
+                cover = np.zeros(self.cells, dtype=np.int64)
+            total += layouts
+            if sub_cover is not None:
+                cover += sub_cover
+            cover[cells] += layouts
+        return total, cover
+
+    def sample(self, rng):
+        """One random walk down the search tree: (weight, covered cell indices).
+
+        The weight is the product of the branching factors met on the way
+        (0 at a dead end), so its mean over walks is the layout count.
+        """
+        counts, avail, uncovered = self.counts, self.avail, self.hits
+        weight = 1
+        cells = []
+        free_phase = False
+        while True:
+            if not uncovered and not free_phase:
+                free_phase = True
+                weight /= math.prod(math.factorial(count) for count in counts)
+            if not any(counts):
+                return (weight if not uncovered else 0), cells
+            if uncovered & ~avail:
+                return 0, cells
+            moves = list(self._moves(counts, avail, uncovered))
+            if not moves:
+                return 0, cells
+            index, (mask, zone, placed) = moves[rng.randrange(len(moves))]
+            weight *= len(moves)
+            cells.extend(placed)
+            counts = counts[:index] + (counts[index] - 1,) + counts[index + 1:]
+            avail &= ~zone
+            uncovered &= ~mask
+
+
+def _bits(mask):
+    # Boolean grid to an integer bitmask, bit row * size + col
+    packed = np.packbits(mask.ravel(), bitorder="little")
+    return int.from_bytes(packed.tobytes(), "little")
+
+
+def counter_for(view, sizes=None):
+    """A :class:`LayoutCounter` for an opponent view board, and the known ship cells."""
+    hits, blocked = observed_masks(view)
+    if sizes is None:
+        sizes = remaining_sizes(view)
+    known = np.zeros((view.size, view.size), dtype=bool)
+    for ship in view.sunk:
+        for r, c in ship.position:
+            known[r, c] = True
+    return LayoutCounter(view.size, list(sizes), _bits(~blocked), _bits(hits)), known | hits
+
+
+def exact_posterior(view, budget=1.0, sizes=None):
+    """:func:`posterior` without the sampling fallback: None if counting takes over ``budget`` seconds."""
+    start = time.perf_counter()
+    counter, known = counter_for(view, sizes)
+    try:
+        layouts, cover = counter.count(budget)
+    except _OutOfTime:
+        return None
+    if not layouts:
+        raise ValueError("No fleet layout is consistent with the observations")
+    size = view.size
+    probabilities = np.zeros(size * size) if cover is None else cover / layouts
+    probabilities = np.maximum(probabilities.reshape(size, size), known)
+    return Posterior(probabilities, True, layouts, elapsed=time.perf_counter() - start)
+
+
+def posterior(view, budget=1.0, sample_budget=None, max_samples=None, seed=None, sizes=None):
+    """Per-cell probability that a ship of ``view``'s opponent is there.
+
+    Counts exactly for up to ``budget`` seconds, then samples for
+    ``sample_budget`` seconds (default: ``budget`` again) or ``max_samples``
+    walks. Raises ValueError if no layout agrees with the observations.
+    """
+    start = time.perf_counter()
+    result = exact_posterior(view, budget, sizes)
+    if result is not None:
+        return result
+    counter, known = counter_for(view, sizes)
+    return _sampled(counter, known, budget if sample_budget is None else sample_budget, max_samples, seed, start)
+
+
+def _sampled(counter, known, budget, max_samples, seed, start):
+    rng = random.Random(seed)
+    size = counter.size
+    deadline = time.perf_counter() + budget
+    weights = []
+    covers = []
+    while (max_samples is None or len(weights) < max_samples) and (time.perf_counter() < deadline or not weights):
+        weight, cells = counter.sample(rng)
+        weights.append(weight)
+        covers.append(cells)
+    weights = np.array(weights, dtype=float)
+    samples = len(weights)
+    total = weights.sum()
+    if not total:
+        raise ValueError(f"No consistent layout found in {samples} samples")
+    hits = np.zeros((samples, size * size))
+    for row, cells in enumerate(covers):
+        hits[row, cells] = 1
+    probabilities = weights @ hits / total
+    # Ratio estimator: var(p) ~ sum(w_i^2 (x_i - p)^2) / (sum w_i)^2
+    variance = (weights ** 2) @ ((hits - probabilities) ** 2) / total ** 2
+    error = float(Z_95 * np.sqrt(variance.max()))
+    probabilities = np.maximum(probabilities.reshape(size, size), known)
+    return Posterior(probabilities, False, total / samples, samples, error, time.perf_counter() - start)
+
+
+def posterior_strategy(view, rng):
+    # Exact probabilities once they are quick to count, the density bot before that
+    result = exact_posterior(view, STRATEGY_BUDGET)
+    if result is None:
+        return density_strategy(view, rng)
+    unknown = np.array([[view.cell(r, c) == "~" for c in range(view.size)] for r in range(view.size)])
+    probabilities = np.where(unknown, result.probabilities, -1.0)
+    rows, cols = np.nonzero(probabilities == probabilities.max())
+    pick = rng.randrange(len(rows))
+    return int(rows[pick]), int(cols[pick])
+
+
+def main(argv=None):
+    import argparse
+    from simulation import play_game
+
+    parser = argparse.ArgumentParser(description="Time exact and sampled layout posteriors along density-bot games")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=1.0, help="seconds for exact counting per position")
+    parser.add_argument("--sample-budget", type=float, default=0.2, help="seconds of sampling when counting runs out")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rows = {}  # tens of shots -> [positions, exact, seconds, summed error of sampled]
+
+    def observe(view, rng):
+        shots = sum(view.cell(r, c) != "~" for r in range(view.size) for c in range(view.size))
+        result = posterior(view, args.budget, args.sample_budget, seed=rng.getrandbits(32))
+        row = rows.setdefault(shots // 10, [0, 0, 0.0, 0.0])
+        row[0] += 1
+        row[1] += result.exact
+        row[2] += result.elapsed
+        row[3] += result.error
+        return density_strategy(view, rng)
+
+    for game in range(args.seed, args.seed + args.games):
+        play_game(observe, density_strategy, game)
+    print(f"{'shots':>7}{'positions':>11}{'exact':>8}{'mean time':>12}{'sampled error':>15}")
+    for tens in sorted(rows):
+        positions, exact, seconds, error = rows[tens]
+        sampled = positions - exact
+        error_text = f"+/-{error / sampled:.3f}" if sampled else "-"
+        print(f"{tens * 10:>3}-{tens * 10 + 9:<3}{positions:>11}{exact / positions:>8.0%}"
+              f"{seconds / positions * 1e3:>9.1f} ms{error_text:>15}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
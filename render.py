@@ -0,0 +1,116 @@
+"""Buffered console renderer for the text game.
+
+Boards are laid out side by side (stacked when the terminal is too narrow)
+and every frame goes out in a single write. On a terminal the renderer
+remembers what is on screen and redraws only the characters that changed,
+using ANSI cursor addressing, then clears the message area under the
+boards; clearing the screen is an escape sequence too, so nothing is
+spawned. When output is not a terminal (a pipe, a file, a test) it prints
+plain full frames with no escape codes.
+"""
+import os
+import shutil
+import sys
+
+CLEAR = "\x1b[H\x1b[2J\x1b[3J"
+CLEAR_BELOW = "\x1b[J"
+GAP = 6
+# Lines kept free under the boards for prompts; if they do not fit, every
+# frame is redrawn in full because the terminal may have scrolled
+MESSAGE_LINES = 16
+
+
+def _move(row, col):
+    return f"\x1b[{row + 1};{col + 1}H"
+
+
+def panel_lines(title, board, hide_ships):
+    lines = board.lines(hide_ships)
+    width = max(len(title), max(map(len, lines)))
+    return [title.ljust(width)] + [line.ljust(width) for line in lines]
+
+
+def layout(panels, columns):
+    """Lines of text for ``[(title, board, hide_ships), ...]``, side by side if they fit."""
+    blocks = [panel_lines(*panel) for panel in panels]
+    width = sum(len(block[0]) for block in blocks) + GAP * (len(blocks) - 1)
+    if width > columns:
+        lines = []
+        for block in blocks:
+            if lines:
+                lines.append("")
+            lines.extend(line.rstrip() for line in block)
+        return lines
+    height = max(len(block) for block in blocks)
+    lines = []
+    for index in range(height):
+        parts = [block[index] if index < len(block) else " " * len(block[0]) for block in blocks]
+        lines.append((" " * GAP).join(parts).rstrip())
+    return lines
+
+
+class ConsoleRenderer:
+    def __init__(self, stream=None, tty=None):
+        self.stream = stream or sys.stdout
+        self.tty = _isatty(self.stream) if tty is None else tty
+        if self.tty and os.name == "nt":
+            _enable_windows_ansi()
+        self.frame = None  # lines on screen from the top-left corner, None if unknown
+
+    def clear(self):
+        """Blank the screen, e.g. so the next player cannot see the last one's fleet."""
+        self.frame = None
+        self._write(CLEAR if self.tty else "\n")
+
+    def show(self, panels):
+        size = shutil.get_terminal_size()
+        lines = layout(panels, size.columns)
+        if not self.tty:
+            self._write("\n".join(lines) + "\n")
+            return
+        if self.frame is None or len(lines) != len(self.frame) or len(lines) + MESSAGE_LINES > size.lines:
+            out = CLEAR + "\n".join(lines) + "\n"
+        else:
+            out = self._diff(lines) + _move(len(lines), 0) + CLEAR_BELOW
+        self.frame = lines
+        self._write(out)
+
+    def _diff(self, lines):
+        parts = []
+        for row, (old, new) in enumerate(zip(self.frame, lines)):
+            if old == new:
+                continue
+            width = max(len(old), len(new))
+            old, new = old.ljust(width), new.ljust(width)
+            col = 0
+            while col < width:
+                if old[col] == new[col]:
+                    col += 1
+                    continue
+                start = col
+                while col < width and old[col] != new[col]:
+                    col += 1
+                parts.append(_move(row, start) + new[start:col])
+        return "".join(parts)
+
+    def _write(self, text):
+        self.stream.write(text)
+        self.stream.flush()
+
+
+def _enable_windows_ansi():
+    # Older Windows consoles only interpret escape codes once asked to
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.GetStdHandle(-11)
+    mode = ctypes.c_uint32()
+    if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        kernel32.SetConsoleMode(handle, mode.value | 0x0004)
+
+
+def _isatty(stream):
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
@@ -0,0 +1,185 @@
+"""Flask REST server hosting many Battleship matches in one process.
+
+    POST   /games                                {"player1": "Ann", "player2": "Bob"}
+    POST   /games/<game_id>/join                 {"name": "Bob"}
+    POST   /games/<game_id>/players/<n>/fleet    {"ships": [{"type": "Cruiser", "row": 0, "col": 0, "orientation": "H"}, ...]}
+                                                 or {"auto": true, "seed": 7}
+    POST   /games/<game_id>/players/<n>/attack   {"row": 3, "col": 4}
+    GET    /games/<game_id>[?player=<n>]
+    DELETE /games/<game_id>
+
+Players are numbered 1 and 2. Creating a game returns player 1's token
+and joining it returns player 2's, once. Placing a fleet, attacking,
+reading a player's own boards (``?player=<n>``) and deleting the game need
+that player's token in an ``Authorization: Bearer <token>`` header;
+without ``?player`` the status is public and shows no boards.
+
+Games live in a :class:`GameStore` that
+locks each game separately, evicts games idle for longer than
+``idle_timeout`` and never holds more than ``max_games`` at once (the
+least recently used game is dropped first).
+"""
+import hmac
+import secrets
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from flask import Flask, jsonify, request
+
+from match import GameError, GameSession
+
+
+class GameStore:
+    def __init__(self, max_games=1000, idle_timeout=30 * 60, clock=time.monotonic):
+        self.max_games = max_games
+        self.idle_timeout = idle_timeout
+        self.clock = clock
+        self.games = OrderedDict()
+        self.lock = threading.Lock()
+        self.evicted = 0
+
+    def create(self, player1_name, player2_name):
+        with self.lock:
+            self._evict_idle()
+            while len(self.games) >= self.max_games:
+                self.games.popitem(last=False)
+                self.evicted += 1
+            game_id = uuid.uuid4().hex[:12]
+            session = GameSession(game_id, player1_name, player2_name)
+            session.last_active = self.clock()
+            # Player 2's token is handed out by the first join
+            session.tokens = [secrets.token_urlsafe(24), secrets.token_urlsafe(24)]
+            session.joined = False
+            self.games[game_id] = session
+            return session
+
+    def get(self, game_id):
+        with self.lock:
+            session = self.games.get(game_id)
+            if session is None:
+                raise GameError("Game not found", 404)
+            now = self.clock()
+            if now - session.last_active > self.idle_timeout:
+                del self.games[game_id]
+                self.evicted += 1
+                raise GameError("Game not found", 404)
+            session.last_active = now
+            self.games.move_to_end(game_id)
+            return session
+
+    def delete(self, game_id):
+        with self.lock:
+            if self.games.pop(game_id, None) is None:
+                raise GameError("Game not found", 404)
+
+    def _evict_idle(self):
+        # Least recently used games are at the front, so stop at the first live one
+        now = self.clock()
+        while self.games:
+            game_id, session = next(iter(self.games.items()))
+            if now - session.last_active <= self.idle_timeout:
+                break
+            del self.games[game_id]
+            self.evicted += 1
+
+    def __len__(self):
+        return len(self.games)
+
+
+def create_app(store=None):
+    if store is None:
+        store = GameStore()
+    app = Flask(__name__)
+    app.config['GAME_STORE'] = store
+
+    @app.errorhandler(GameError)
+    def game_error(error):
+        return jsonify({'error': str(error)}), error.status
+
+    def payload():
+        data = request.get_json(silent=True)
+        if data is None:
+            return {}
+        if not isinstance(data, dict):
+            raise GameError("The request body must be a JSON object")
+        return data
+
+    def bearer_token():
+        header = request.headers.get("Authorization", "")
+        return header[len("Bearer "):] if header.startswith("Bearer ") else ""
+
+    def authorize(session, players=(1, 2)):
+        # The request must carry the token issued to one of ``players``
+        token = bearer_token()
+        tokens = [session.tokens[session.player_index(player)] for player in players]
+        if not token or not any(hmac.compare_digest(token, own) for own in tokens):
+            raise GameError("Invalid or missing player token", 403)
+
+    @app.post("/games")
+    def create_game():
+        data = payload()
+        session = store.create(data.get("player1") or "Player 1", data.get("player2") or "Player 2")
+        return jsonify({**session.status(), 'player': 1, 'token': session.tokens[0]}), 201
+
+    @app.post("/games/<game_id>/join")
+    def join_game(game_id):
+        data = payload()
+        session = store.get(game_id)
+        with session.lock:
+            if session.joined:
+                raise GameError("Player 2 has already joined", 409)
+            session.joined = True
+            if data.get("name"):
+                session.players[1].name = str(data["name"])
+            return jsonify({**session.status(), 'player': 2, 'token': session.tokens[1]}), 201
+
+    @app.get("/games/<game_id>")
+    def game_status(game_id):
+        session = store.get(game_id)
+        player = request.args.get("player", type=int)
+        with session.lock:
+            if player is not None:
+                authorize(session, (player,))
+            return jsonify(session.status(player))
+
+    @app.delete("/games/<game_id>")
+    def delete_game(game_id):
+        authorize(store.get(game_id))
+        store.delete(game_id)
+        return "", 204
+
+    @app.post("/games/<game_id>/players/<int:player>/fleet")
+    def place_fleet_route(game_id, player):
+        session = store.get(game_id)
+        with session.lock:
+            authorize(session, (player,))
+            session.place_fleet(player, payload())
+            return jsonify(session.status(player))
+
+    @app.post("/games/<game_id>/players/<int:player>/attack")
+    def attack(game_id, player):
+        session = store.get(game_id)
+        with session.lock:
+            authorize(session, (player,))
+            return jsonify(session.attack(player, payload()))
+
+    @app.get("/stats")
+    def stats():
+        return jsonify({'games': len(store), 'max_games': store.max_games, 'evicted': store.evicted})
+
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the Battleship REST server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--max-games", type=int, default=1000)
+    parser.add_argument("--idle-timeout", type=float, default=30 * 60, help="seconds before an idle game is evicted")
+    args = parser.parse_args()
+
+    create_app(GameStore(args.max_games, args.idle_timeout)).run(args.host, args.port, threaded=True)
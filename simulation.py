@@ -0,0 +1,181 @@
+"""Headless Battleship games between pluggable strategies.
+
+A strategy is any picklable callable ``strategy(view, rng) -> (row, col)``.
+``view`` is the attacking player's ``opponent_board``: attacked cells read
+"X" (hit) or "O" (miss) through ``view.cell`` and ``view.sunk`` lists the
+enemy ships sunk so far. ``rng`` is a seeded ``random.Random`` so every
+game can be replayed exactly from its seed.
+"""
+import os
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from Board import Board
+from Player import Player
+from fleet import random_fleet
+from movelog import MoveLog
+
+
+def random_strategy(view, rng):
+    cells = [(r, c) for r in range(view.size) for c in range(view.size) if view.cell(r, c) == "~"]
+    return rng.choice(cells)
+
+
+def hunt_target_strategy(view, rng):
+    # Fire next to unsunk hits first, otherwise hunt on a checkerboard
+    sunk_cells = {pos for ship in view.sunk for pos in ship.position}
+    size = view.size
+    for r in range(size):
+        for c in range(size):
+            if view.cell(r, c) == "X" and (r, c) not in sunk_cells:
+                for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+                    if 0 <= nr < size and 0 <= nc < size and view.cell(nr, nc) == "~":
+                        return nr, nc
+    cells = [(r, c) for r in range(size) for c in range(size) if view.cell(r, c) == "~"]
+    parity = [(r, c) for r, c in cells if (r + c) % 2 == 0]
+    return rng.choice(parity or cells)
+
+
+def play_game(strategy1, strategy2, seed=None, board_class=Board, first=0, move_log=None):
+    """Play one silent game and return ``(winner, shots)``.
+
+    ``winner`` is 0 if ``strategy1`` won and 1 otherwise; ``shots`` is the
+    number of shots the winner fired. A hit keeps the turn, as in ``game.py``.
+    With a :class:`movelog.MoveLog` the game is recorded under a fresh game id.
+    """
+    rng = random.Random(seed)
+    players = []
+    for index in range(2):
+        board = random_fleet(board_class(), rng=rng)
+        players.append(Player(f"Player {index + 1}", board, board_class()))
+    recorder = move_log.start_game(*players, buffered=True) if move_log else None
+    strategies = (strategy1, strategy2)
+    shots = [0, 0]
+    turn = first
+    while True:
+        attacker, defender = players[turn], players[1 - turn]
+        row, col = strategies[turn](attacker.opponent_board, rng)
+        result = attacker.fire(defender, row, col)
+        shots[turn] += 1
+        if result.remaining == 0:
+            if recorder:
+                recorder.end(attacker)
+            return turn, shots[turn]
+        if result.outcome != "hit":
+            turn = 1 - turn
+
+
+class BatchStats:
+    def __init__(self):
+        self.games = 0
+        self.wins = [0, 0]
+        self.shots_to_win = Counter()
+        self.elapsed = 0.0
+
+    def record(self, winner, shots):
+        self.games += 1
+        self.wins[winner] += 1
+        self.shots_to_win[shots] += 1
+
+    def merge(self, other):
+        self.games += other.games
+        self.wins[0] += other.wins[0]
+        self.wins[1] += other.wins[1]
+        self.shots_to_win.update(other.shots_to_win)
+
+    @property
+    def games_per_second(self):
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def win_rates(self):
+        if not self.games:
+            return (0.0, 0.0)
+        return (self.wins[0] / self.games, self.wins[1] / self.games)
+
+    def mean_shots(self):
+        if not self.games:
+            return 0.0
+        return sum(shots * n for shots, n in self.shots_to_win.items()) / self.games
+
+    def summary(self):
+        return {
+            'games': self.games,
+            'elapsed': self.elapsed,
+            'games_per_second': self.games_per_second,
+            'wins': list(self.wins),
+            'win_rates': list(self.win_rates),
+            'mean_shots_to_win': self.mean_shots(),
+            'shots_to_win': dict(sorted(self.shots_to_win.items())),
+        }
+
+
+def _play_chunk(strategy1, strategy2, seeds, board_class, log_path=None):
+    stats = BatchStats()
+    move_log = MoveLog(log_path) if log_path else None
+    try:
+        for seed in seeds:
+            # Alternate who opens so neither strategy gets the first-move edge
+            winner, shots = play_game(strategy1, strategy2, seed, board_class, first=seed % 2, move_log=move_log)
+            stats.record(winner, shots)
+    finally:
+        if move_log:
+            move_log.close()
+    return stats
+
+
+def run_batch(strategy1, strategy2, games, seed=0, workers=None, chunk_size=500, board_class=Board,
+              progress=None, log_path=None):
+    """Play ``games`` games with seeds ``seed .. seed + games - 1``.
+
+    Chunks of ``chunk_size`` games are spread over ``workers`` processes
+    (``os.cpu_count()`` by default, ``1`` runs in this process) and merged
+    as they finish. ``progress``, if given, is called with the running
+    :class:`BatchStats` after every chunk. With ``log_path`` every game is
+    appended to that move log.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = [range(start, min(start + chunk_size, seed + games))
+              for start in range(seed, seed + games, chunk_size)]
+    stats = BatchStats()
+    start_time = time.perf_counter()
+    if workers == 1:
+        for seeds in chunks:
+            stats.merge(_play_chunk(strategy1, strategy2, seeds, board_class, log_path))
+            stats.elapsed = time.perf_counter() - start_time
+            if progress:
+                progress(stats)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_play_chunk, strategy1, strategy2, seeds, board_class, log_path) for seeds in chunks]
+            for future in as_completed(futures):
+                stats.merge(future.result())
+                stats.elapsed = time.perf_counter() - start_time
+                if progress:
+                    progress(stats)
+    stats.elapsed = time.perf_counter() - start_time
+    return stats
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Run headless AI-vs-AI Battleship games")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--log", default=None, help="append every game to this move log")
+    args = parser.parse_args(argv)
+
+    result = run_batch(hunt_target_strategy, random_strategy, args.games, args.seed, args.workers, args.chunk_size,
+                       log_path=args.log)
+    print(json.dumps(result.summary(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
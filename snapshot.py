@@ -0,0 +1,237 @@
+"""Compact, versioned binary snapshots of a two-player match.
+
+Layout (version 2, all integers little-endian)::
+
+    b"BS"  version:u8  size:u8  flags:u8
+    [fleet_len:u8  (ship_size:u8 count:u16) * fleet_len]   # only with flags bit 6
+    name1_len:u8 name1  name2_len:u8 name2
+    grid1  grid2            # 2 bits per cell, ceil(size * size / 4) bytes each
+
+``flags`` holds the phase (bits 0-1), whose turn it is (bit 2), whether
+there is a winner (bit 3) and who it is (bit 4), whether player 2 is the
+computer (bit 5) and whether the match uses a fleet other than the
+board's default :func:`config.scaled_fleet` (bit 6). Cells are coded
+0 water, 1 ship, 2 hit, 3 miss. Version 1 snapshots, which have no fleet
+and always use the default, can still be restored.
+
+Nothing else needs storing: under the no-touch rule every connected group
+of ship cells is exactly one ship, its class follows from its length,
+and each player's view of the enemy waters is the set of hits and misses
+on the other player's grid. A standard 10x10 match takes 57 bytes plus
+the two names.
+
+The console game and the GUI use :func:`save`/:func:`load` for save and
+resume; :func:`snapshot`/:func:`restore` work on any two players, so
+batch runs can checkpoint games in flight the same way.
+"""
+import struct
+
+from BitBoard import BitBoard
+from Board import Board
+from Player import Player
+from Ship import Orientation
+from config import FLEET, scaled_fleet, ship_size
+
+SAVE_FILE = "battleship.sav"
+MAGIC = b"BS"
+VERSION = 2
+PHASES = ("placement_p1", "placement_p2", "battle", "game_over")
+SHIP_BY_SIZE = {ship_class().size: ship_class for ship_class, _ in FLEET}
+
+_HEADER = struct.Struct("<2sBBB")
+_FLEET_ENTRY = struct.Struct("<BH")
+# Low and high bit of each cell code, as "0"/"1" characters
+_LOW = str.maketrans("~SXO", "0101")
+_HIGH = str.maketrans("~SXO", "0011")
+
+
+class SnapshotError(ValueError):
+    pass
+
+def _bit_strings(board):
+    cells = board.size * board.size
+    if isinstance(board, BitBoard):
+        low = (board.ship_mask & ~board.hit_mask) | board.miss_mask
+        high = board.hit_mask | board.miss_mask
+        return format(low, f"0{cells}b")[::-1], format(high, f"0{cells}b")[::-1]
+    flat = "".join(map("".join, board.grid))
+    return flat.translate(_LOW), flat.translate(_HIGH)
+
+
+def _pack_grid(board):
+    low, high = _bit_strings(board)
+    bits = bytearray(2 * len(low))
+    bits[0::2] = low.encode()
+    bits[1::2] = high.encode()
+    return int(bits[::-1], 2).to_bytes((len(low) + 3) // 4, "little")
+
+
+def _unpack_grid(data, size):
+    # Returns "0"/"1" strings in cell order: cells holding a ship, cells shot at
+    cells = size * size
+    bits = format(int.from_bytes(data, "little"), f"0{2 * cells}b")[::-1]
+    low, high = bits[0::2], bits[1::2]
+    ships = int(low[::-1], 2) ^ int(high[::-1], 2)
+    return format(ships, f"0{cells}b")[::-1], high
+
+
+def _ones(bits):
+    index = bits.find("1")
+    while index != -1:
+        yield index
+        index = bits.find("1", index + 1)
+
+
+def snapshot(player1, player2, phase="battle", turn=0, winner=None, vs_computer=False):
+    """Serialize both players' boards plus phase/turn/winner to bytes."""
+    if phase not in PHASES:
+        raise SnapshotError(f"Unknown phase {phase!r}")
+    size = player1.board.size
+    if size > 255:
+        raise SnapshotError("Snapshots store the board size in one byte; boards up to 255 are supported")
+    flags = PHASES.index(phase) | (turn & 1) << 2
+    if winner is not None:
+        flags |= 1 << 3 | (winner & 1) << 4
+    if vs_computer:
+        flags |= 1 << 5
+    fleet = _fleet_entries(player1, player2)
+    if fleet is not None:
+        flags |= 1 << 6
+    parts = [_HEADER.pack(MAGIC, VERSION, size, flags)]
+    if fleet is not None:
+        parts.append(bytes([len(fleet)]) + b"".join(_FLEET_ENTRY.pack(*entry) for entry in fleet))
+    for player in (player1, player2):
+        # Cut on a character boundary so the name still decodes
+        name = player.name.encode("utf-8")[:255].decode("utf-8", "ignore").encode("utf-8")
+        parts.append(bytes([len(name)]) + name)
+    parts.append(_pack_grid(player1.board))
+    parts.append(_pack_grid(player2.board))
+    return b"".join(parts)
+
+
+def restore(data, board_class=Board, player_class=Player, computer_class=None):
+    """Rebuild a match from :func:`snapshot` bytes.
+
+    Returns a dict with ``player1``, ``player2``, ``phase``, ``turn``,
+    ``winner`` (0, 1 or None) and ``vs_computer``. Player 2 is created with
+    ``computer_class`` when the snapshot says it was the computer.
+    """
+    try:
+        magic, version, size, flags = _HEADER.unpack_from(data)
+    except struct.error:
+        raise SnapshotError("Snapshot is truncated")
+    if magic != MAGIC:
+        raise SnapshotError("Not a Battleship snapshot")
+    if version not in (1, VERSION):
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    offset = _HEADER.size
+    fleet = None
+    if version > 1 and flags >> 6 & 1:
+        fleet, offset = _read_fleet(data, offset)
+    names = []
+    for _ in range(2):
+        if len(data) < offset + 1 or len(data) < offset + 1 + data[offset]:
+            raise SnapshotError("Snapshot is truncated")
+        length = data[offset]
+        try:
+            names.append(data[offset + 1:offset + 1 + length].decode("utf-8"))
+        except UnicodeDecodeError:
+            raise SnapshotError("Player name is not valid UTF-8")
+        offset += 1 + length
+    grid_bytes = (size * size + 3) // 4
+    if len(data) < offset + 2 * grid_bytes:
+        raise SnapshotError("Snapshot is truncated")
+    grids = [_unpack_grid(data[offset:offset + grid_bytes], size),
+             _unpack_grid(data[offset + grid_bytes:offset + 2 * grid_bytes], size)]
+
+    vs_computer = bool(flags >> 5 & 1)
+    players = []
+    for index, name in enumerate(names):
+        cls = computer_class if index == 1 and vs_computer and computer_class else player_class
+        player = cls(name, board_class(size, fleet), board_class(size, fleet))
+        _place_ships(player, grids[index][0], size)
+        players.append(player)
+    # Replaying the shots rebuilds hit counts, sunk ships and both enemy views
+    for index in (0, 1):
+        attacker, defender = players[1 - index], players[index]
+        for cell in _ones(grids[index][1]):
+            attacker.fire(defender, *divmod(cell, size))
+    return {
+        'player1': players[0],
+        'player2': players[1],
+        'phase': PHASES[flags & 3],
+        'turn': flags >> 2 & 1,
+        'winner': flags >> 4 & 1 if flags >> 3 & 1 else None,
+        'vs_computer': vs_computer,
+    }
+
+
+def _fleet_entries(player1, player2):
+    # ``(ship size, count)`` pairs of a non-default fleet, None for the default one
+    fleet = player1.board.fleet
+    if tuple(player2.board.fleet) != tuple(fleet):
+        raise SnapshotError("Both players must play the same fleet")
+    if tuple(fleet) == scaled_fleet(player1.board.size):
+        return None
+    if len(fleet) > 255:
+        raise SnapshotError("Snapshots store up to 255 kinds of ship")
+    entries = []
+    for ship_class, count in fleet:
+        length = ship_size(ship_class)
+        if SHIP_BY_SIZE.get(length) is not ship_class:
+            # Restore tells ships apart by length alone
+            raise SnapshotError(f"Snapshots only store the standard ship classes, not {ship_class.__name__}")
+        if count > 0xFFFF:
+            raise SnapshotError(f"Snapshots store up to {0xFFFF} ships of a class")
+        entries.append((length, count))
+    return entries
+
+
+def _read_fleet(data, offset):
+    if len(data) < offset + 1 or len(data) < offset + 1 + data[offset] * _FLEET_ENTRY.size:
+        raise SnapshotError("Snapshot is truncated")
+    fleet = []
+    for index in range(data[offset]):
+        length, count = _FLEET_ENTRY.unpack_from(data, offset + 1 + index * _FLEET_ENTRY.size)
+        if length not in SHIP_BY_SIZE:
+            raise SnapshotError(f"No ship of length {length}")
+        fleet.append((SHIP_BY_SIZE[length], count))
+    return tuple(fleet), offset + 1 + data[offset] * _FLEET_ENTRY.size
+
+
+def save(path, player1, player2, **state):
+    data = snapshot(player1, player2, **state)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def load(path, **classes):
+    with open(path, "rb") as f:
+        return restore(f.read(), **classes)
+
+
+def _place_ships(player, ships, size):
+    seen = set()
+    for start in _ones(ships):
+        if start in seen:
+            continue
+        # Ships are straight, so the group extends right or down from its first cell
+        row, col = divmod(start, size)
+        group = [start]
+        for step, limit in ((1, size - col), (size, size - row)):
+            cell = start + step
+            while len(group) < limit and ships[cell] == "1":
+                group.append(cell)
+                cell += step
+            if len(group) > 1:
+                break
+        if len(group) not in SHIP_BY_SIZE:
+            # A group of lone hits belongs to no known ship
+            raise SnapshotError(f"No ship of length {len(group)}")
+        seen.update(group)
+        ship = SHIP_BY_SIZE[len(group)]()
+        positions = [divmod(cell, size) for cell in group]
+        player.board.place_ships(ship, positions)
+        horizontal = len(group) == 1 or group[1] == start + 1
+        ship.orientation = Orientation.HORIZONTAL if horizontal else Orientation.VERTICAL
@@ -0,0 +1,158 @@
+"""Disk cache for the resized and rotated GUI sprites.
+
+Resampling the PNGs in ``assets/`` to cell-sized sprites is the slowest
+part of starting the GUI. :class:`SpriteCache` stores every variant it
+produces under ``assets/.cache``, keyed by a hash of the source file, the
+target size, the rotation and the resampling filter, so later launches
+only decode a small PNG. :class:`LazyImages` wraps the cache in a mapping
+that creates each Tk image the first time it is used.
+
+Run ``python sprites.py`` to compare cold and warm load times.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+from PIL import Image
+
+CACHE_DIR = os.path.join("assets", ".cache")
+
+
+class SpriteCache:
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._hashes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def source_hash(self, path):
+        digest = self._hashes.get(path)
+        if digest is None:
+            with open(path, "rb") as f:
+                digest = self._hashes[path] = hashlib.sha1(f.read()).hexdigest()[:16]
+        return digest
+
+    def load(self, path, size, rotate=0, resample=None):
+        """Return ``path`` resized to ``size`` and then rotated by ``rotate`` degrees."""
+        width, height = size
+        key = f"{self.source_hash(path)}_{width}x{height}_r{rotate}_{resample}.png"
+        cached = os.path.join(self.cache_dir, key)
+        try:
+            image = Image.open(cached)
+            image.load()
+            self.hits += 1
+            return image
+        except OSError:
+            pass
+        self.misses += 1
+        image = Image.open(path)
+        image = image.resize(size) if resample is None else image.resize(size, resample)
+        if rotate:
+            image = image.rotate(rotate, expand=True)
+        self._store(cached, image)
+        return image
+
+    def _store(self, cached, image):
+        # Write to a temporary file first so a concurrent launch never reads half a PNG
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(suffix=".png", dir=self.cache_dir)
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, format="PNG")
+            os.replace(tmp, cached)
+        except OSError as e:
+            print(f"Could not cache sprite {cached}: {e}")
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+class LazyImages:
+    """Mapping from sprite name to Tk image, loaded on first access.
+
+    ``name in images`` loads the sprite if needed and is False if it could
+    not be loaded, so callers can fall back to plain shapes.
+    """
+
+    def __init__(self, cache, factory, on_error=None):
+        self.cache = cache
+        self.factory = factory
+        self.on_error = on_error
+        self.specs = {}
+        self.loaded = {}
+        self.failed = set()
+
+    def register(self, name, path, size, rotate=0, resample=None):
+        self.specs[name] = (path, size, rotate, resample)
+
+    def _get(self, name):
+        image = self.loaded.get(name)
+        if image is not None or name in self.failed or name not in self.specs:
+            return image
+        try:
+            image = self.loaded[name] = self.factory(self.cache.load(*self.specs[name]))
+        except Exception as e:
+            print(f"Error loading image {name}: {e}")
+            if not self.failed and self.on_error:
+                self.on_error(e)
+            self.failed.add(name)
+        return image
+
+    def __contains__(self, name):
+        return self._get(name) is not None
+
+    def __getitem__(self, name):
+        image = self._get(name)
+        if image is None:
+            raise KeyError(name)
+        return image
+
+    def preload(self, *names):
+        for name in names:
+            self._get(name)
+
+
+def register_sprites(images, cell_size, grid_size, ships, asset_dir="assets"):
+    """Register the water background and ship variants used by the GUI.
+
+    ``ships`` yields ``(name, size, image_file)``; ships longer than one
+    cell also get a vertical ``<name>_V`` variant.
+    """
+    images.register('water', os.path.join(asset_dir, "water.png"), (cell_size * grid_size, cell_size * grid_size))
+    for name, size, image_file in ships:
+        path = os.path.join(asset_dir, image_file)
+        images.register(name, path, (cell_size * size, cell_size), resample=Image.LANCZOS)
+        if size > 1:
+            images.register(f"{name}_V", path, (cell_size * size, cell_size), rotate=90, resample=Image.LANCZOS)
+
+
+def time_startup(cache_dir, cell_size, grid_size, ships, asset_dir="assets"):
+    """Load every GUI sprite once without Tk and return the elapsed seconds.
+
+    Raises ``OSError`` if any sprite failed to load, so a missing asset
+    directory is not timed as a fast startup.
+    """
+    images = LazyImages(SpriteCache(cache_dir), factory=lambda image: image)
+    register_sprites(images, cell_size, grid_size, ships, asset_dir)
+    start = time.perf_counter()
+    images.preload(*images.specs)
+    elapsed = time.perf_counter() - start
+    if images.failed:
+        raise OSError(f"Could not load sprites from {asset_dir}: {', '.join(sorted(images.failed))}")
+    return elapsed
+
+
+if __name__ == "__main__":
+    from gui_test import CELL_SIZE, GRID_SIZE, SHIP_CLASSES
+
+    ships = [(name, size, image_file) for name, (_, _, size, image_file) in SHIP_CLASSES.items()]
+    cache_dir = tempfile.mkdtemp(prefix="battleship-sprites-")
+    try:
+        cold = time_startup(cache_dir, CELL_SIZE, GRID_SIZE, ships)
+        warm = time_startup(cache_dir, CELL_SIZE, GRID_SIZE, ships)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    print(f"cold sprite load: {cold * 1e3:.1f} ms")
+    print(f"warm sprite load: {warm * 1e3:.1f} ms")
@@ -0,0 +1,122 @@
+"""Stress check for per-board fleet accounting.
+
+Sets up many games at once, first across a thread pool and then as
+interleaved asyncio tasks, placing every ship by hand through
+``Ship.place_ship``. Each board must end up with exactly its own fleet,
+refuse one ship more and leave a fresh board untouched; the process exits
+with status 1 if any count leaked between games.
+
+    python stress.py --games 2000 --threads 16
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from BitBoard import BitBoard
+from Board import Board
+from Player import Player
+from SparseBoard import SparseBoard
+from fleet import random_layout
+
+BOARD_CLASSES = {'list': Board, 'bit': BitBoard, 'sparse': SparseBoard}
+
+
+def _players(seed, board_class):
+    rng = random.Random(seed)
+    players = [Player(f"Player {index + 1}", board_class(), board_class()) for index in range(2)]
+    layouts = [random_layout(board_class(), rng=rng) for _ in players]
+    return players, layouts
+
+
+def _place(player, entry):
+    ship_class, orientation, row, col = entry
+    ship_class().place_ship(row, col, orientation, player.board)
+
+
+def check_game(seed, players, board_class):
+    """Return a list of problems with one game's fleets after placement."""
+    problems = []
+    for player in players:
+        expected = {ship_class: count for ship_class, count in player.fleet}
+        if player.board.placed != expected:
+            problems.append(f"game {seed}: {player.name} placed {player.board.placed}, expected {expected}")
+        left = [count for _, _, count, _ in player.ships_to_place.values()]
+        if any(left):
+            problems.append(f"game {seed}: {player.name} still has {left} to place")
+        ship_class = player.fleet[-1][0]
+        try:
+            ship_class().place_ship(0, 0, "H", player.board)
+            problems.append(f"game {seed}: {player.name} accepted an extra {ship_class.__name__}")
+        except ValueError as e:
+            if not str(e).startswith("Cannot place more"):
+                problems.append(f"game {seed}: extra {ship_class.__name__} refused for the wrong reason: {e}")
+    if board_class().placed:
+        problems.append(f"game {seed}: a fresh board starts with ships counted")
+    return problems
+
+
+def threaded_game(seed, board_class):
+    players, layouts = _players(seed, board_class)
+    for player, layout in zip(players, layouts):
+        for entry in layout:
+            _place(player, entry)
+    return check_game(seed, players, board_class)
+
+
+async def async_game(seed, board_class):
+    players, layouts = _players(seed, board_class)
+    # Both players place one ship at a time, yielding to the other games in between
+    for entries in zip(*layouts):
+        for player, entry in zip(players, entries):
+            _place(player, entry)
+            await asyncio.sleep(0)
+    return check_game(seed, players, board_class)
+
+
+def run_threads(games, threads, board_class):
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = pool.map(threaded_game, range(games), [board_class] * games)
+        return [problem for problems in results for problem in problems]
+
+
+async def run_tasks(games, board_class):
+    results = await asyncio.gather(*(async_game(seed, board_class) for seed in range(games)))
+    return [problem for problems in results for problem in problems]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Set up many games at once and check fleet counts do not leak")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--board", choices=BOARD_CLASSES, default="list")
+    args = parser.parse_args(argv)
+    board_class = BOARD_CLASSES[args.board]
+
+    # Switch threads as often as possible so placements interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        start = time.perf_counter()
+        problems = run_threads(args.games, args.threads, board_class)
+        print(f"threads: {args.games} games on {args.threads} threads in {time.perf_counter() - start:.2f}s")
+    finally:
+        sys.setswitchinterval(interval)
+
+    start = time.perf_counter()
+    problems += asyncio.run(run_tasks(args.games, board_class))
+    print(f"asyncio: {args.games} games as tasks in {time.perf_counter() - start:.2f}s")
+
+    for problem in problems[:20]:
+        print(problem)
+    if problems:
+        print(f"FAILED: {len(problems)} problem(s)")
+        return 1
+    print("OK: every board kept its own fleet count")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""Round-robin tournament between targeting strategies.
+
+Every pair of strategies plays ``games`` seeded games through
+:func:`simulation.play_game` (seeds ``seed .. seed + games - 1``, so every
+pairing sees the same fleets and who opens alternates by seed). The pairings
+are cut into chunks that are spread over a process pool, and each finished
+chunk is appended to a JSON-lines results file. Running the same command
+again skips the chunks already in the file, so an interrupted tournament
+picks up where it stopped.
+
+Ratings are Bradley-Terry maximum-likelihood strengths on the Elo scale
+(mean 1500), with bootstrap confidence intervals; win rates get Wilson
+intervals.
+
+    python tournament.py --games 1000 --results tournament.jsonl
+    python tournament.py random hunt_target density --games 200 --workers 4
+"""
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+
+import numpy as np
+
+from BitBoard import BitBoard
+from Board import Board
+from SparseBoard import SparseBoard
+from bot import density_strategy
+from mapcache import cached_density_strategy
+from posterior import posterior_strategy
+from simulation import hunt_target_strategy, play_game, random_strategy
+
+STRATEGIES = {
+    'random': random_strategy,
+    'hunt_target': hunt_target_strategy,
+    'density': density_strategy,
+    'density_cached': cached_density_strategy,
+    'posterior': posterior_strategy,
+}
+BOARD_CLASSES = {'list': Board, 'bit': BitBoard, 'sparse': SparseBoard}
+Z_95 = 1.959964
+
+
+def _play_pair(name1, name2, seeds, board):
+    # Runs in a worker; strategies travel by name
+    strategy1, strategy2 = STRATEGIES[name1], STRATEGIES[name2]
+    wins = [0, 0]
+    shots = [0, 0]
+    for seed in seeds:
+        winner, winner_shots = play_game(strategy1, strategy2, seed, BOARD_CLASSES[board], first=seed % 2)
+        wins[winner] += 1
+        shots[winner] += winner_shots
+    return {'pair': [name1, name2], 'start': seeds.start, 'stop': seeds.stop, 'wins': wins, 'shots': shots}
+
+
+class Tournament:
+    def __init__(self, names, games=1000, seed=0, chunk_size=100, board='list'):
+        unknown = [name for name in names if name not in STRATEGIES]
+        if unknown:
+            raise ValueError(f"Unknown strategies: {', '.join(unknown)}")
+        if len(names) < 2:
+            raise ValueError("A tournament needs at least two strategies")
+        self.names = list(names)
+        self.games = games
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.board = board
+        self.chunks = []  # finished chunk records
+
+    @property
+    def config(self):
+        return {'games': self.games, 'seed': self.seed, 'chunk_size': self.chunk_size, 'board': self.board}
+
+    def pairs(self):
+        return list(combinations(self.names, 2))
+
+    def tasks(self):
+        done = {(frozenset(chunk['pair']), chunk['start']) for chunk in self.chunks}
+        for start in range(self.seed, self.seed + self.games, self.chunk_size):
+            seeds = range(start, min(start + self.chunk_size, self.seed + self.games))
+            for pair in self.pairs():
+                if (frozenset(pair), start) not in done:
+                    yield pair, seeds
+
+    @property
+    def total_games(self):
+        return self.games * len(self.pairs())
+
+    @property
+    def games_played(self):
+        return sum(chunk['stop'] - chunk['start'] for chunk in self.chunks)
+
+    def load(self, path):
+        """Read finished chunks back from a results file, if there is one."""
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line may be cut short by an interruption
+                    continue
+                if 'config' in record:
+                    if record['config'] != self.config:
+                        raise ValueError(f"{path} was written with different settings: {record['config']}")
+                elif set(record['pair']) <= set(self.names):
+                    # Chunks involving strategies left out of this run stay in the file only
+                    self.chunks.append(record)
+
+    def run(self, workers=None, results=None, progress=None):
+        """Play every chunk not played yet.
+
+        Finished chunks are appended to the ``results`` file as they come in
+        and ``progress``, if given, is called after each with
+        ``(games_played, total_games, games_per_second)``.
+        """
+        workers = workers or os.cpu_count() or 1
+        out = None
+        if results:
+            self.load(results)
+            out = open(results, "a")
+            if os.path.getsize(results) == 0:
+                out.write(json.dumps({'config': self.config}) + "\n")
+                out.flush()
+        start_time = time.perf_counter()
+        played = 0
+
+        def finish(record):
+            nonlocal played
+            self.chunks.append(record)
+            played += record['stop'] - record['start']
+            if out:
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+            if progress:
+                elapsed = time.perf_counter() - start_time
+                progress(self.games_played, self.total_games, played / elapsed if elapsed else 0.0)
+
+        try:
+            tasks = list(self.tasks())
+            if workers == 1:
+                for (name1, name2), seeds in tasks:
+                    finish(_play_pair(name1, name2, seeds, self.board))
+            else:
+                pool = ProcessPoolExecutor(max_workers=workers)
+                try:
+                    futures = [pool.submit(_play_pair, name1, name2, seeds, self.board)
+                               for (name1, name2), seeds in tasks]
+                    for future in as_completed(futures):
+                        finish(future.result())
+                finally:
+                    # On interruption, drop the chunks that have not started
+                    pool.shutdown(cancel_futures=True)
+        finally:
+            if out:
+                out.close()
+        return self.standings()
+
+    def win_matrix(self):
+        # wins[i, j]: games strategy i won against strategy j
+        index = {name: i for i, name in enumerate(self.names)}
+        wins = np.zeros((len(self.names), len(self.names)))
+        shots = np.zeros(len(self.names))
+        for chunk in self.chunks:
+            i, j = (index[name] for name in chunk['pair'])
+            wins[i, j] += chunk['wins'][0]
+            wins[j, i] += chunk['wins'][1]
+            shots[i] += chunk['shots'][0]
+            shots[j] += chunk['shots'][1]
+        return wins, shots
+
+    def standings(self, samples=200, rng_seed=0):
+        """Ratings table, best first, plus the pairwise win-rate matrix."""
+        wins, shots = self.win_matrix()
+        games = wins + wins.T
+        elo = elo_ratings(wins)
+        low, high = _bootstrap_elo(wins, games, samples, np.random.default_rng(rng_seed))
+        rows = []
+        for i, name in enumerate(self.names):
+            won, played = wins[i].sum(), games[i].sum()
+            rate_low, rate_high = wilson_interval(won, played)
+            rows.append({
+                'strategy': name,
+                'elo': float(elo[i]),
+                'elo_ci': [float(low[i]), float(high[i])],
+                'games': int(played),
+                'wins': int(won),
+                'win_rate': won / played if played else 0.0,
+                'win_rate_ci': [rate_low, rate_high],
+                'mean_shots_to_win': shots[i] / won if won else None,
+            })
+        rows.sort(key=lambda row: row['elo'], reverse=True)
+        with np.errstate(invalid="ignore"):
+            rates = np.where(games > 0, wins / np.maximum(games, 1), np.nan)
+        matrix = {a: {b: (None if math.isnan(rates[i, j]) else float(rates[i, j]))
+                      for j, b in enumerate(self.names) if i != j}
+                  for i, a in enumerate(self.names)}
+        return {'config': self.config, 'games_played': self.games_played, 'ratings': rows, 'win_rates': matrix}
+
+
+def elo_ratings(wins, iterations=500, tolerance=1e-9):
+    """Bradley-Terry strengths fitted by minorization-maximization, as Elo.
+
+    Half a win is added each way to every pairing so that a clean sweep
+    still gives a finite rating.
+    """
+    n = len(wins)
+    wins = wins + 0.5 * (1 - np.eye(n))
+    games = wins + wins.T
+    total = wins.sum(axis=1)
+    strength = np.ones(n)
+    for _ in range(iterations):
+        denominator = (games / (strength[:, None] + strength[None, :])).sum(axis=1)
+        updated = total / denominator
+        updated /= np.exp(np.log(updated).mean())
+        if np.abs(updated - strength).max() < tolerance:
+            strength = updated
+            break
+        strength = updated
+    elo = 400 * np.log10(strength)
+    return elo - elo.mean() + 1500
+
+
+def _bootstrap_elo(wins, games, samples, rng):
+    # Parametric bootstrap: redraw every pairing's result from its observed win rate
+    if samples <= 0:
+        elo = elo_ratings(wins)
+        return elo, elo
+    upper = np.triu(games, 1).astype(np.int64)
+    rates = np.divide(wins, games, out=np.full_like(wins, 0.5), where=games > 0)
+    draws = []
+    for _ in range(samples):
+        resampled = rng.binomial(upper, np.triu(rates, 1)).astype(float)
+        sample = resampled + (upper - resampled).T
+        draws.append(elo_ratings(sample))
+    draws = np.array(draws)
+    return np.percentile(draws, 2.5, axis=0), np.percentile(draws, 97.5, axis=0)
+
+
+def wilson_interval(successes, trials, z=Z_95):
+    if not trials:
+        return [0.0, 1.0]
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return [max(0.0, centre - margin), min(1.0, centre + margin)]
+
+
+def format_standings(standings):
+    lines = [f"{'#':>2}  {'strategy':<14}{'elo':>7}  {'95% CI':<15}{'win rate':>9}  {'95% CI':<15}{'games':>7}  {'shots/win':>9}"]
+    for rank, row in enumerate(standings['ratings'], 1):
+        elo_low, elo_high = row['elo_ci']
+        rate_low, rate_high = row['win_rate_ci']
+        shots = f"{row['mean_shots_to_win']:.1f}" if row['mean_shots_to_win'] is not None else "-"
+        lines.append(f"{rank:>2}  {row['strategy']:<14}{row['elo']:>7.0f}  {f'[{elo_low:.0f}, {elo_high:.0f}]':<15}"
+                     f"{row['win_rate']:>9.1%}  {f'[{rate_low:.1%}, {rate_high:.1%}]':<15}{row['games']:>7}  {shots:>9}")
+    names = [row['strategy'] for row in standings['ratings']]
+    lines.append("")
+    lines.append("win rate of row vs column")
+    lines.append(" " * 14 + "".join(f"{name:>14}" for name in names))
+    for a in names:
+        cells = []
+        for b in names:
+            rate = standings['win_rates'][a].get(b)
+            cells.append(f"{'-' if rate is None else f'{rate:.1%}':>14}")
+        lines.append(f"{a:<14}" + "".join(cells))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Round-robin tournament between Battleship strategies")
+    parser.add_argument("strategies", nargs="*", help=f"strategies to enter (default: all of {', '.join(STRATEGIES)})")
+    parser.add_argument("--games", type=int, default=1000, help="games per pairing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--board", choices=BOARD_CLASSES, default="list")
+    parser.add_argument("--results", default=None, help="JSON-lines file to record chunks in and resume from")
+    parser.add_argument("--json", dest="json_path", help="write the final standings to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        tournament = Tournament(args.strategies or list(STRATEGIES), args.games, args.seed, args.chunk_size, args.board)
+    except ValueError as e:
+        parser.error(str(e))
+
+    def progress(done, total, rate):
+        print(f"\r{done}/{total} games ({done / total:.0%}), {rate:.0f} games/sec", end="", file=sys.stderr, flush=True)
+
+    try:
+        standings = tournament.run(args.workers, args.results, progress)
+    except KeyboardInterrupt:
+        print("\nInterrupted; run the same command again to resume" if args.results else "\nInterrupted", file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    print(format_standings(standings))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(standings, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())